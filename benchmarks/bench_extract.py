@@ -0,0 +1,135 @@
+"""
+Benchmark for reader-page extraction: the original path (full BeautifulSoup tree,
+regex for the font URL, second BeautifulSoup parse for get_text) against every
+backend in src/core/extract.py.
+
+Usage: python benchmarks/bench_extract.py [--pages DIR] [--repeat 20]
+DIR holds recorded reader pages (*.html); without it a synthetic page is used.
+Before timing, every backend is also checked against bs4 on EDGE_CASES.
+"""
+import argparse
+import glob
+import os
+import random
+import re
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from bs4 import BeautifulSoup
+from src.core.extract import EXTRACTORS, get_extractor
+
+
+def synthetic_page(paragraphs=120, seed=1):
+    """A reader page shaped like fanqienovel.com's: header chrome, content div, footer scripts."""
+    rng = random.Random(seed)
+    chars = [chr(c) for c in range(0xE3E8, 0xE55B)] + list("，。！？的了是在我有他这")
+    body = "".join(
+        "<p>" + "".join(rng.choice(chars) for _ in range(rng.randint(40, 160))) + "</p>"
+        for _ in range(paragraphs)
+    )
+    chrome = "".join(f'<div class="nav-item"><a href="/page/{i}">链接 {i}</a></div>' for i in range(300))
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>第一章</title>'
+        '<style>@font-face{font-family:dc;src:url(https://lf6-awef.bytetos.com/obj/awesome-font/c/96fc7b50b772f52.woff2)}</style>'
+        f'</head><body><div class="muye-header">{chrome}</div>'
+        '<div class="muye-reader"><h1 class="muye-reader-title">第一章</h1>'
+        f'<div class="muye-reader-content noselect"><div>{body}</div></div></div>'
+        f'<script>window.__INITIAL_STATE__={{"a":"{"x" * 20000}"}}</script></body></html>'
+    )
+
+
+FONT = '<style>@font-face{src:url(https://lf6-awef.bytetos.com/obj/awesome-font/c/96fc7b50b772f52.woff2)}</style>'
+
+# Valid HTML that trips naive tag patterns; every backend must read it like bs4 does
+EDGE_CASES = {
+    "literal < and > in text": '<div class="muye-reader-content"><p>x < y and z > w</p><p>a<3 &lt;b&gt;</p></div>',
+    "> inside attribute values": '<div class="muye-reader-content"><p title="a>b">s</p><p data-x=\'1>2\'>t</p></div>',
+    "> before the class attribute": '<div data-x="a>b" class="muye-reader-content"><p>found</p></div>',
+    "single-quoted and unquoted class": "<div class='x muye-reader-content'><p>one</p></div><div class=muye-reader-content><p>two</p></div>",
+    "class name inside another attribute": '<div title="class=\'muye-reader-content\'">decoy</div><div class="muye-reader-content"><p>real</p></div>',
+    "similar class names": '<div class="muye-reader-content-x">no</div><div class="muye-reader-content"><p>yes</p></div>',
+    "nested divs and comments": '<div class="muye-reader-content"><div><p>a</p><!-- <div> --></div><div/><p>b</p></div><p>after</p>',
+    "scripts and styles": '<div class="muye-reader-content"><script>if (a<b) x = "</div>";</script><style>p>i{}</style><p>text &amp; more</p></div>',
+    "blocked page": '<div data-x="a>b" class="no-content">请登录</div>',
+    "missing content": '<div class="muye-reader">nothing here</div>',
+}
+
+
+def reference_output(extractor, html):
+    page = extractor.extract_chapter(html)
+    text = extractor.html_to_text(page["content_html"]) if page["content_html"] is not None else None
+    return text, page["font_url"], page["blocked"]
+
+
+def check_edge_cases():
+    """Returns the names of the backends whose output differs from bs4 on an edge case."""
+    reference = get_extractor("bs4")
+    failed = []
+    for name in sorted(EXTRACTORS):
+        extractor = get_extractor(name)
+        for case, body in EDGE_CASES.items():
+            html = f"<html><head>{FONT}</head><body>{body}</body></html>"
+            got, expected = reference_output(extractor, html), reference_output(reference, html)
+            if got != expected:
+                print(f"{name:14s}: differs from bs4 on '{case}': {got!r} != {expected!r}")
+                failed.append(name)
+                break
+    return failed
+
+
+def legacy(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    content_div = soup.find('div', class_='muye-reader-content')
+    font_match = re.search(r"https://[^\"']+\.woff2", html)
+    text = BeautifulSoup(str(content_div), 'html.parser').get_text(separator='\n')
+    return text, font_match.group(0) if font_match else None
+
+
+def backend(extractor):
+    def run(html):
+        page = extractor.extract_chapter(html)
+        return extractor.html_to_text(page["content_html"]), page["font_url"]
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', help="directory of recorded reader pages (*.html)")
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    if args.pages:
+        pages = []
+        for path in sorted(glob.glob(os.path.join(args.pages, '*.html'))):
+            with open(path, encoding='utf-8') as f:
+                pages.append(f.read())
+        if not pages:
+            raise SystemExit(f"No *.html pages found in {args.pages}")
+    else:
+        pages = [synthetic_page(seed=i) for i in range(5)]
+    total_kb = sum(len(p.encode('utf-8')) for p in pages) / 1024
+    print(f"{len(pages)} pages, {total_kb:.0f} KB, {args.repeat} rounds")
+
+    broken = check_edge_cases()
+    candidates = [("legacy bs4 x2", legacy)] + [
+        (name, backend(get_extractor(name))) for name in sorted(EXTRACTORS) if name not in broken]
+    expected = [legacy(p) for p in pages]
+    baseline = None
+    for name, fn in candidates:
+        if [fn(p) for p in pages] != expected:
+            print(f"{name:14s}: output differs from the legacy path, skipped")
+            continue
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for p in pages:
+                fn(p)
+        per_page = (time.perf_counter() - start) / (args.repeat * len(pages))
+        baseline = baseline or per_page
+        print(f"{name:14s}: {per_page * 1000:8.2f} ms/page  {baseline / per_page:6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark for font parsing: the original path (write the woff2 to a temp file, open
+it eagerly with TTFont, delete it) against FanqieScraper._parse_font, which reads
+the bytes from memory and decompiles only what the glyph order and cmap need.
+
+Usage: python benchmarks/bench_font_parse.py [--font test.woff2] [--repeat 200]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from fontTools.ttLib import TTFont
+from src.core.scraper import FanqieScraper
+
+
+def legacy(font_bytes):
+    with tempfile.NamedTemporaryFile(suffix='.woff2', delete=False) as tmp:
+        tmp.write(font_bytes)
+        tmp_path = tmp.name
+    try:
+        font = TTFont(tmp_path)
+        mapping = FanqieScraper._build_font_map(font.getGlyphOrder(), font.getBestCmap())
+        font.close()
+        return mapping
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def measure(candidates, font_bytes, repeat):
+    """
+    Times every candidate once per round, round after round, so CPU frequency drift
+    hits all of them alike. Returns {name: sorted samples}.
+    """
+    samples = {name: [] for name, _ in candidates}
+    for _, fn in candidates:
+        fn(font_bytes)  # warm-up: imports and fontTools table classes
+    for _ in range(repeat):
+        for name, fn in candidates:
+            start = time.perf_counter()
+            fn(font_bytes)
+            samples[name].append(time.perf_counter() - start)
+    return {name: sorted(values) for name, values in samples.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--font', default=os.path.join(ROOT, 'test.woff2'))
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    with open(args.font, 'rb') as f:
+        font_bytes = f.read()
+    print(f"{os.path.basename(args.font)}: {len(font_bytes) / 1024:.1f} KB, {args.repeat} parses")
+
+    scraper = FanqieScraper()
+    expected = legacy(font_bytes)
+    if scraper._parse_font(font_bytes) != expected:
+        raise SystemExit("In-memory parser produced a different mapping")
+
+    candidates = [("temp file", legacy), ("in-memory lazy", scraper._parse_font)]
+    samples = measure(candidates, font_bytes, args.repeat)
+    baseline = None
+    for name, _ in candidates:
+        values = samples[name]
+        p50, p99 = statistics.median(values), values[int(0.99 * (len(values) - 1))]
+        baseline = baseline or p50
+        print(f"{name:15s}: p50 {p50 * 1000:6.2f} ms  p99 {p99 * 1000:6.2f} ms  {baseline / p50:5.2f}x")
+
+
+if __name__ == '__main__':
+    main()
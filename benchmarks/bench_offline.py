@@ -0,0 +1,142 @@
+"""
+End-to-end scraper benchmark against the local fake site (no live traffic).
+
+Runs get_novel -> download_chapters -> write_txt with FanqieScraper and reports
+chapters/sec, p50/p99 per-chapter latency, font-parse time and peak RSS.
+
+Usage: python benchmarks/bench_offline.py [--chapters 500] [--workers 8] [--latency 0.02]
+                                          [--pages DIR] [--json out.json]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_site import FakeSite
+from src.core.scraper import FanqieScraper
+from src.core.ratelimit import RateLimiter
+
+
+class TimedScraper(FanqieScraper):
+    """FanqieScraper that records per-chapter and font-parse timings."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.chapter_times = []
+        self.font_parse_times = []
+        self._timing_lock = threading.Lock()
+
+    def get_chapter_content(self, chapter_url, use_cache=True):
+        start = time.perf_counter()
+        try:
+            return super().get_chapter_content(chapter_url, use_cache)
+        finally:
+            with self._timing_lock:
+                self.chapter_times.append(time.perf_counter() - start)
+
+    def _parse_font(self, font_bytes):
+        start = time.perf_counter()
+        try:
+            return super()._parse_font(font_bytes)
+        finally:
+            self.font_parse_times.append(time.perf_counter() - start)
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes elsewhere
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def run(args):
+    site = FakeSite(chapters=args.chapters, paragraphs=args.paragraphs, latency=args.latency, pages_dir=args.pages)
+    base_url = site.start()
+    # Politeness is not what is being measured here, so the limiter never throttles
+    limiter = RateLimiter(rate=1e6, burst=1e6, max_rate=1e6)
+    scraper = TimedScraper("sessionid=bench", "Mozilla/5.0 Chrome/131.0.0.0", rate_limiter=limiter)
+    scraper.base_url = base_url
+
+    try:
+        start = time.perf_counter()
+        novel = scraper.get_novel(f"{base_url}/page/1")
+        index_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = scraper.download_chapters(novel["chapters"], workers=args.workers)
+        download_time = time.perf_counter() - start
+
+        ok = [c for c in results if c]
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            with open(os.path.join(tmp, "novel.txt"), "w", encoding="utf-8") as f:
+                scraper.write_txt(novel["metadata"], ok, f)
+            export_time = time.perf_counter() - start
+            output_mb = os.path.getsize(os.path.join(tmp, "novel.txt")) / (1024 * 1024)
+    finally:
+        site.stop()
+
+    return {
+        "chapters": len(results),
+        "failed": len(results) - len(ok),
+        "workers": args.workers,
+        "server_latency_s": args.latency,
+        "index_s": index_time,
+        "download_s": download_time,
+        "chapters_per_s": len(results) / download_time if download_time else 0.0,
+        "chapter_p50_ms": percentile(scraper.chapter_times, 50) * 1000,
+        "chapter_p99_ms": percentile(scraper.chapter_times, 99) * 1000,
+        "font_parses": len(scraper.font_parse_times),
+        "font_parse_ms": sum(scraper.font_parse_times) * 1000,
+        "export_s": export_time,
+        "output_mb": output_mb,
+        "peak_rss_mb": peak_rss_mb(),
+        "requests": site.requests,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--chapters', type=int, default=500)
+    parser.add_argument('--paragraphs', type=int, default=60)
+    parser.add_argument('--workers', type=int, default=FanqieScraper.MAX_WORKERS)
+    parser.add_argument('--latency', type=float, default=0.02, help="simulated server latency in seconds")
+    parser.add_argument('--pages', help="directory of recorded pages (novel.html, reader_<n>.html)")
+    parser.add_argument('--json', help="also write the report to this file")
+    args = parser.parse_args()
+
+    report = run(args)
+    print(f"chapters        : {report['chapters']} ({report['failed']} failed), {report['workers']} workers")
+    print(f"novel page      : {report['index_s'] * 1000:.1f} ms")
+    print(f"download        : {report['download_s']:.2f} s, {report['chapters_per_s']:.1f} chapters/s")
+    print(f"chapter latency : p50 {report['chapter_p50_ms']:.1f} ms, p99 {report['chapter_p99_ms']:.1f} ms")
+    print(f"font parse      : {report['font_parses']} parse(s), {report['font_parse_ms']:.1f} ms")
+    print(f"export          : {report['export_s']:.2f} s, {report['output_mb']:.1f} MB")
+    if report['peak_rss_mb'] is not None:
+        print(f"peak RSS        : {report['peak_rss_mb']:.1f} MB")
+    print(f"requests served : {report['requests']}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
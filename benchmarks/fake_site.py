@@ -0,0 +1,166 @@
+"""
+Local stand-in for fanqienovel.com used by the offline benchmarks.
+
+Serves a novel page (/page/<id>) with .chapter-item links, reader pages
+(/reader/<n>) with div.muye-reader-content and obfuscated text, and the
+obfuscation font (/font/<name>.woff2, test.woff2 from the repo root by default).
+Responses carry an ETag and answer If-None-Match with 304.
+
+Run standalone with: python benchmarks/fake_site.py [--port 8765] [--chapters 200]
+"""
+import argparse
+import hashlib
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DEFAULT_FONT = os.path.join(ROOT, 'test.woff2')
+
+# Code points obfuscated by test.woff2
+OBFUSCATED = [chr(c) for c in range(0xE3E8, 0xE55C)]
+PLAIN = list("，。！？“”的了是在我有他这中大来上国个到说们为子和你地出道也时年")
+
+
+class FakeSite:
+    def __init__(self, chapters=200, paragraphs=60, latency=0.0, font_path=DEFAULT_FONT, pages_dir=None):
+        """
+        chapters: number of chapters listed on the novel page
+        paragraphs: paragraphs per synthetic reader page
+        latency: artificial delay in seconds before every response
+        pages_dir: optional directory of recorded pages; novel.html and
+                   reader_<n>.html there replace the synthetic ones
+        """
+        self.chapters = chapters
+        self.paragraphs = paragraphs
+        self.latency = latency
+        self.pages_dir = pages_dir
+        with open(font_path, 'rb') as f:
+            self.font_bytes = f.read()
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self, port=0):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                site._handle(self)
+
+            def log_message(self, format, *args):
+                return
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="FakeSite", daemon=True).start()
+        return self.base_url
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def _handle(self, handler):
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        path = handler.path.split('?')[0]
+        if path.startswith('/page/'):
+            body, ctype = self._recorded('novel.html') or self.novel_page(), 'text/html; charset=utf-8'
+        elif path.startswith('/reader/'):
+            n = path.rsplit('/', 1)[-1]
+            body, ctype = self._recorded(f'reader_{n}.html') or self.reader_page(int(n)), 'text/html; charset=utf-8'
+        elif path.startswith('/font/') and path.endswith('.woff2'):
+            body, ctype = self.font_bytes, 'font/woff2'
+        else:
+            body, ctype = b'not found', 'text/plain'
+            handler.send_response(404)
+            handler.send_header('Content-Type', ctype)
+            handler.send_header('Content-Length', str(len(body)))
+            handler.end_headers()
+            handler.wfile.write(body)
+            return
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        # Strong validator like a real CDN, so conditional requests can be exercised
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+        if handler.headers.get('If-None-Match') == etag:
+            handler.send_response(304)
+            handler.send_header('ETag', etag)
+            handler.end_headers()
+            return
+        handler.send_response(200)
+        handler.send_header('ETag', etag)
+        handler.send_header('Content-Type', ctype)
+        handler.send_header('Content-Length', str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def _recorded(self, name):
+        if not self.pages_dir:
+            return None
+        path = os.path.join(self.pages_dir, name)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as f:
+            return f.read().replace('{base_url}', self.base_url)
+
+    def novel_page(self):
+        items = "".join(
+            f'<div class="chapter-item"><a href="/reader/{i}" class="chapter-item-title">第{i}章 测试章节</a></div>'
+            for i in range(1, self.chapters + 1)
+        )
+        return (
+            '<!DOCTYPE html><html><head><meta charset="utf-8"><title>离线测试小说</title></head><body>'
+            '<div class="page-header-info"><h1>离线测试小说</h1>'
+            '<span class="author-name-text">测试作者</span>'
+            '<img class="novel-cover-image" src="/cover.jpg"></div>'
+            f'<div class="page-directory-content">{items}</div></body></html>'
+        )
+
+    def reader_page(self, n):
+        rng = random.Random(n)
+        body = "".join(
+            "<p>" + "".join(rng.choice(OBFUSCATED) if rng.random() < 0.3 else rng.choice(PLAIN)
+                            for _ in range(rng.randint(40, 160))) + "</p>"
+            for _ in range(self.paragraphs)
+        )
+        return (
+            f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>第{n}章</title>'
+            f'<style>@font-face{{font-family:dc;src:url({self.base_url}/font/dc027189e0ba4cd.woff2)}}</style>'
+            '</head><body><div class="muye-reader">'
+            f'<h1 class="muye-reader-title">第{n}章 测试章节</h1>'
+            f'<div class="muye-reader-content noselect"><div>{body}</div></div></div>'
+            '<script>window.__INITIAL_STATE__={}</script></body></html>'
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for fanqienovel.com")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--chapters', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--pages', help="directory of recorded pages")
+    args = parser.parse_args()
+    site = FakeSite(chapters=args.chapters, latency=args.latency, pages_dir=args.pages)
+    print(f"Serving on {site.start(args.port)}/page/1 (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        site.stop()
+
+
+if __name__ == '__main__':
+    main()
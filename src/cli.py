@@ -0,0 +1,176 @@
+"""
+Headless downloader: python -m src.cli URL [URL ...] [-f urls.txt] [-o DIR]
+
+Runs the same download/export pipeline as the Streamlit app without importing
+Streamlit, so it starts quickly and can run from cron on a server.
+Exit status is 0 when every novel was fully downloaded, 1 when any novel or
+chapter failed and 2 on usage errors.
+"""
+import argparse
+import os
+import shutil
+import sys
+
+
+def read_url_file(path):
+    """One URL per line; blank lines and lines starting with # are ignored."""
+    handle = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    try:
+        return [line.strip() for line in handle if line.strip() and not line.strip().startswith("#")]
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cli",
+        description="下载番茄小说为 TXT（无需启动图形界面）",
+    )
+    parser.add_argument("urls", nargs="*", help="小说目录页 URL，可填多个")
+    parser.add_argument("-f", "--file", action="append", default=[],
+                        help="包含 URL 的文本文件，每行一个（'-' 表示标准输入）")
+    parser.add_argument("-o", "--output", help="保存目录（默认 ~/bijianchuanqi）")
+    parser.add_argument("-w", "--workers", type=int, default=4, help="并发下载线程数（默认 4）")
+    parser.add_argument("--cookie", default=os.environ.get("FANQIE_COOKIE"),
+                        help="Cookie 字符串，VIP 章节需要（也可用环境变量 FANQIE_COOKIE）")
+    parser.add_argument("--cookie-file", help="从文件读取 Cookie 字符串")
+    parser.add_argument("--user-agent", help="自定义 User-Agent")
+    parser.add_argument("-u", "--update", action="store_true",
+                        help="增量更新：只下载上次导出后新增或变化的章节并追加到已有 TXT")
+    parser.add_argument("--update-all", action="store_true",
+                        help="增量更新保存目录中所有已下载过的小说")
+    parser.add_argument("--no-resume", action="store_true", help="忽略未完成的下载进度，重新开始")
+    parser.add_argument("--no-cache", action="store_true", help="不使用本地章节和字体缓存")
+    parser.add_argument("--log-level", help="调试日志级别：DEBUG/INFO/WARNING/ERROR/OFF")
+    parser.add_argument("-q", "--quiet", action="store_true", help="不显示进度")
+    return parser
+
+
+def format_progress(jobs):
+    """One status line covering every job: title done/total per novel."""
+    parts = []
+    for job in jobs:
+        name = job["title"] or job["url"]
+        if job["total"]:
+            parts.append(f"{name} {job['completed'] + job['failed']}/{job['total']}")
+        else:
+            parts.append(f"{name} {job['status']}")
+    return " | ".join(parts)
+
+
+def run_updates(scraper, urls, args):
+    """Incremental update of each novel in turn; returns the exit status."""
+    from src.core.pipeline import update_novel, DownloadError
+
+    exit_code = 0
+    for url in urls:
+        on_progress = None
+        if not args.quiet and sys.stderr.isatty():
+            def on_progress(done, total, completed, failed, url=url):
+                sys.stderr.write(f"\r{url}: {done}/{total}")
+                sys.stderr.flush()
+        try:
+            result = update_novel(scraper, url, save_dir=args.output, workers=args.workers,
+                                  progress_callback=on_progress)
+        except DownloadError as e:
+            print(f"\n失败: {e}" if on_progress else f"失败: {e}", file=sys.stderr)
+            exit_code = 1
+            continue
+        except KeyboardInterrupt:
+            print("\n已中断", file=sys.stderr)
+            return 130
+        if on_progress:
+            sys.stderr.write("\n")
+        if result["failed"]:
+            exit_code = 1
+        print(f"{result['title']}: 新增 {result['added']} 章，失败 {result['failed']} 章 -> {result['path']}")
+    return exit_code
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    urls = list(args.urls)
+    try:
+        for path in args.file:
+            urls.extend(read_url_file(path))
+    except OSError as e:
+        parser.error(f"无法读取 URL 文件: {e}")
+    if args.update_all:
+        from src.core.manifest import iter_manifests
+        urls.extend(m["novel_url"] for m in iter_manifests(args.output) if m["novel_url"] not in urls)
+        args.update = True
+    if not urls:
+        parser.error("请提供至少一个小说 URL")
+    if args.workers < 1:
+        parser.error("--workers 必须大于 0")
+
+    cookie_str = args.cookie
+    if args.cookie_file:
+        try:
+            with open(args.cookie_file, "r", encoding="utf-8") as f:
+                cookie_str = f.read().strip()
+        except OSError as e:
+            parser.error(f"无法读取 Cookie 文件: {e}")
+
+    # Heavy imports only after argument parsing, so --help and usage errors are instant
+    from src.core.logger import set_log_level
+    from src.core.jobqueue import DownloadQueue, DONE
+    from src.core.scraper import FanqieScraper
+    from src.core.utils import get_save_dir
+
+    if args.log_level:
+        set_log_level(args.log_level)
+
+    chapter_cache = font_cache = novel_cache = None
+    if not args.no_cache:
+        from src.core.cache import ChapterCache, FontMapCache, NovelPageCache
+        chapter_cache, font_cache, novel_cache = ChapterCache(), FontMapCache(), NovelPageCache()
+    scraper = FanqieScraper(cookie_str, args.user_agent, max_workers=args.workers,
+                            chapter_cache=chapter_cache, font_cache=font_cache, novel_cache=novel_cache)
+
+    if args.update:
+        return run_updates(scraper, urls, args)
+
+    # All novels share one queue: chapters are fetched round-robin across them under
+    # one rate limit, and unfinished jobs from an interrupted run are picked up again
+    # The CLI keeps its own queue file so it never picks up (or clears) the UI's jobs
+    save_dir = args.output or get_save_dir()
+    queue = DownloadQueue(scraper, save_dir=save_dir, workers=args.workers,
+                          state_path=os.path.join(save_dir, ".queue-cli.json"))
+    job_ids = {queue.add(url, resume=not args.no_resume).id for url in urls}
+    show_progress = not args.quiet and sys.stderr.isatty()
+    queue.start()
+    try:
+        while not queue.wait(timeout=1):
+            if show_progress:
+                line = format_progress([j for j in queue.snapshot() if j["status"] not in ("done", "failed")])
+                width = shutil.get_terminal_size().columns - 1
+                sys.stderr.write("\r" + line[:width].ljust(width))
+                sys.stderr.flush()
+    except KeyboardInterrupt:
+        queue.stop()
+        print("\n已中断，下次运行会从断点继续", file=sys.stderr)
+        return 130
+    if show_progress:
+        sys.stderr.write("\n")
+
+    exit_code = 0
+    for job in queue.snapshot():
+        if job["id"] not in job_ids:
+            continue
+        name = job["title"] or job["url"]
+        if job["status"] != DONE:
+            exit_code = 1
+        if job["path"]:
+            print(f"{name}: {job['completed']}/{job['total']} 章 -> {job['path']}")
+        if job["error"]:
+            print(f"失败: {name}: {job['error']}", file=sys.stderr)
+    queue.clear_finished()
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
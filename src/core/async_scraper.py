@@ -0,0 +1,215 @@
+import asyncio
+import contextvars
+import time
+from .scraper import FanqieScraper
+from .utils import log_debug
+from .metrics import timed, count
+from .singleflight import AsyncSingleFlight
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class AsyncFanqieScraper(FanqieScraper):
+    """
+    asyncio flavour of FanqieScraper.
+    Network calls run as coroutines over a single aiohttp session, so one event loop
+    can keep hundreds of chapter requests in flight across several novels.
+    Parsing reuses the synchronous helpers, so results have the same shape
+    ({content_html, font_url}) and generate_txt/generate_html work unchanged.
+    """
+    # Upper bound on in-flight requests shared by every coroutine of this scraper
+    MAX_CONCURRENCY = 64
+
+    def __init__(self, cookie_str=None, user_agent=None, max_concurrency=None, rate_limiter=None, chapter_cache=None, font_cache=None, extractor=None, novel_cache=None):
+        super().__init__(cookie_str, user_agent, rate_limiter=rate_limiter, chapter_cache=chapter_cache,
+                         font_cache=font_cache, extractor=extractor, novel_cache=novel_cache)
+        self.max_concurrency = max_concurrency or self.MAX_CONCURRENCY
+        self._client = None
+        self._semaphore = None
+        self._afont_flight = AsyncSingleFlight()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def aclose(self):
+        if self._client is not None and not self._client.closed:
+            await self._client.close()
+        self._client = None
+
+    def _get_client(self):
+        if aiohttp is None:
+            raise RuntimeError("Async mode requires aiohttp (pip install aiohttp)")
+        if self._client is None or self._client.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+            self._client = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=30),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def _fetch(self, url, binary=False):
+        client = self._get_client()
+        async with self._semaphore:
+            async with client.get(url) as response:
+                log_debug("Response Status: %s", response.status)
+                response.raise_for_status()
+                if binary:
+                    return await response.read()
+                return await response.text()
+
+    async def aget_novel_metadata(self, url):
+        """
+        Coroutine version of get_novel_metadata.
+        """
+        novel = await self.aget_novel(url)
+        return novel["metadata"] if novel else None
+
+    async def aget_novel(self, url):
+        """
+        Coroutine version of get_novel: one fetch and one parse for metadata and chapters,
+        revalidated against the novel_cache when there is one.
+        """
+        try:
+            cached = self._get_cached_novel(url)
+            client = self._get_client()
+            with timed("fetch_index"):
+                async with self._semaphore:
+                    async with client.get(url, headers=self._validator_headers(cached)) as response:
+                        log_debug("Response Status: %s", response.status)
+                        if response.status == 304 and cached:
+                            log_debug("Novel page not modified: %s", url)
+                            count("index_not_modified")
+                            return cached["novel"]
+                        response.raise_for_status()
+                        html = await response.text()
+                        response_headers = response.headers
+            with timed("parse_index"):
+                novel = self._parse_novel_page(html, url)
+            self._store_novel(url, novel, response_headers)
+            return novel
+        except Exception as e:
+            print(f"Error fetching novel: {e}")
+            return None
+
+    async def aget_chapter_content(self, chapter_url, use_cache=True):
+        """
+        Coroutine version of get_chapter_content.
+        """
+        if use_cache:
+            cached = self._get_cached_chapter(chapter_url)
+            if cached:
+                return cached
+
+        log_debug("Fetching chapter: %s", chapter_url)
+        await self.rate_limiter.acquire_async()
+        start = time.monotonic()
+        status = None
+        try:
+            client = self._get_client()
+            with timed("fetch"):
+                async with self._semaphore:
+                    async with client.get(chapter_url) as response:
+                        status = response.status
+                        log_debug("Response Status: %s", response.status)
+                        response.raise_for_status()
+                        html = await response.text()
+                        validators = (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+            with timed("parse"):
+                content = self._parse_chapter_page(html, chapter_url)
+            self.rate_limiter.record(status, time.monotonic() - start, blocked=content is None)
+            if content and self.chapter_cache is not None:
+                self.chapter_cache.put(chapter_url, content, *validators)
+            return content
+        except Exception as e:
+            self.rate_limiter.record(status, time.monotonic() - start)
+            log_debug("Error fetching chapter content: %s", e)
+            print(f"Error fetching chapter content: {e}")
+            return None
+
+    async def aget_font_map(self, font_url):
+        """
+        Downloads the woff2 font without blocking the loop and parses it in a worker thread.
+        The mapping lands in self.font_maps, so later generate_txt calls hit the cache.
+        Concurrent calls for the same font wait on a single download.
+        """
+        if not font_url:
+            return {}
+
+        if font_url in self.font_maps:
+            return self.font_maps[font_url]
+        return await self._afont_flight.do(font_url, self._aload_font_map, font_url)
+
+    async def _aload_font_map(self, font_url):
+        if font_url in self.font_maps:
+            return self.font_maps[font_url]
+
+        mapping = self._get_cached_font_map(font_url)
+        if mapping:
+            return mapping
+
+        try:
+            print(f"Downloading font: {font_url}")
+            with timed("font_download"):
+                font_bytes = await self._fetch(font_url, binary=True)
+            loop = asyncio.get_running_loop()
+            ctx = contextvars.copy_context()
+            return await loop.run_in_executor(None, ctx.run, self._store_font_map, font_url, font_bytes)
+        except Exception as e:
+            print(f"Error processing font {font_url}: {e}")
+            return {}
+
+    async def adownload_chapters(self, chapters, progress_callback=None):
+        """
+        Coroutine version of download_chapters.
+        Returns a list in the same order as chapters; failed chapters are None.
+        Fonts seen in the results are fetched as well so export needs no further network calls.
+        """
+        total = len(chapters)
+        results = [None] * total
+        if total == 0:
+            return results
+
+        counts = {"done": 0, "completed": 0, "failed": 0}
+
+        async def fetch(i, chapter):
+            content = await self.aget_chapter_content(chapter['url'])
+            if content:
+                content['title'] = chapter['title']
+                counts["completed"] += 1
+            else:
+                counts["failed"] += 1
+            results[i] = content
+            counts["done"] += 1
+            if progress_callback:
+                progress_callback(counts["done"], total, counts["completed"], counts["failed"])
+
+        await asyncio.gather(*(fetch(i, chapter) for i, chapter in enumerate(chapters)))
+
+        font_urls = {c['font_url'] for c in results if c and c.get('font_url')}
+        await asyncio.gather(*(self.aget_font_map(u) for u in font_urls))
+        return results
+
+
+def download_novels(urls, cookie_str=None, user_agent=None, max_concurrency=None):
+    """
+    Convenience wrapper: fetches metadata, chapter lists and chapters for several novels
+    on one event loop. Returns a list of (metadata, chapter_results) tuples in input order.
+    """
+    async def run():
+        async with AsyncFanqieScraper(cookie_str, user_agent, max_concurrency) as scraper:
+            async def one(url):
+                novel = await scraper.aget_novel(url)
+                if not novel:
+                    return None, []
+                return novel["metadata"], await scraper.adownload_chapters(novel["chapters"])
+            return await asyncio.gather(*(one(u) for u in urls))
+
+    return asyncio.run(run())
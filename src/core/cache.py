@@ -0,0 +1,234 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from .utils import get_save_dir, log_debug
+
+
+class _SQLiteStore:
+    """
+    Shared plumbing for the on-disk caches: one SQLite file under <save dir>/.cache,
+    a single connection guarded by a lock so worker threads can share it.
+    """
+    FILENAME = None
+    SCHEMA = ()
+
+    def __init__(self, path=None):
+        if path is None:
+            cache_dir = os.path.join(get_save_dir(), ".cache")
+            os.makedirs(cache_dir, exist_ok=True)
+            path = os.path.join(cache_dir, self.FILENAME)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in self.SCHEMA:
+                self._conn.execute(statement)
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ChapterCache(_SQLiteStore):
+    """
+    SQLite-backed store of fetched chapters keyed by chapter URL.
+    Holds the raw content_html and font_url exactly as get_chapter_content returns them,
+    plus the fetch time and the HTTP validators (ETag / Last-Modified) of the response.
+    Safe to share between download worker threads.
+    """
+    FILENAME = "chapters.sqlite3"
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS chapters ("
+        " url TEXT PRIMARY KEY,"
+        " content_html TEXT NOT NULL,"
+        " font_url TEXT,"
+        " fetched_at REAL NOT NULL,"
+        " etag TEXT,"
+        " last_modified TEXT)",
+    )
+
+    def get(self, url):
+        """
+        Returns {content_html, font_url, fetched_at, etag, last_modified} or None.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_html, font_url, fetched_at, etag, last_modified FROM chapters WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if not row:
+            return None
+        return {
+            "content_html": row[0],
+            "font_url": row[1],
+            "fetched_at": row[2],
+            "etag": row[3],
+            "last_modified": row[4],
+        }
+
+    def put(self, url, content, etag=None, last_modified=None):
+        """
+        Stores a chapter dict ({content_html, font_url}) under url.
+        """
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO chapters (url, content_html, font_url, fetched_at, etag, last_modified)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (url, content["content_html"], content.get("font_url"), time.time(), etag, last_modified),
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            log_debug(f"Chapter cache write failed for {url}: {e}")
+
+    def delete(self, url):
+        with self._lock:
+            self._conn.execute("DELETE FROM chapters WHERE url = ?", (url,))
+            self._conn.commit()
+
+
+class FontMapCache(_SQLiteStore):
+    """
+    Persistent cache of finished font maps (obfuscated code -> real char).
+    Maps are stored once per SHA-256 of the woff2 bytes; font URLs point at a hash,
+    so a known URL needs neither download nor TTFont parsing, and a new URL serving
+    an already seen font only needs the download.
+    Each map is kept as two equal-length strings (codes and chars), which is compact
+    and converts straight back into a dict. The woff2 bytes themselves are kept too,
+    for exports that embed the font (HTML).
+    """
+    FILENAME = "fonts.sqlite3"
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS font_maps ("
+        " sha256 TEXT PRIMARY KEY,"
+        " codes TEXT NOT NULL,"
+        " chars TEXT NOT NULL,"
+        " created_at REAL NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS font_urls ("
+        " url TEXT PRIMARY KEY,"
+        " sha256 TEXT NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS font_files ("
+        " sha256 TEXT PRIMARY KEY,"
+        " data BLOB NOT NULL)",
+    )
+
+    def get_by_url(self, font_url):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT m.codes, m.chars FROM font_urls u JOIN font_maps m ON m.sha256 = u.sha256 WHERE u.url = ?",
+                (font_url,),
+            ).fetchone()
+        return self._decode(row)
+
+    def get_by_hash(self, sha256):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT codes, chars FROM font_maps WHERE sha256 = ?", (sha256,)
+            ).fetchone()
+        return self._decode(row)
+
+    def put(self, font_url, sha256, mapping):
+        """
+        Stores mapping under sha256 (if not stored yet) and points font_url at it.
+        """
+        if any(len(ch) != 1 for ch in mapping.values()):
+            log_debug(f"Font map for {font_url} has multi-char entries, not cached")
+            return
+        codes = "".join(chr(code) for code in mapping)
+        chars = "".join(mapping.values())
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO font_maps (sha256, codes, chars, created_at) VALUES (?, ?, ?, ?)",
+                    (sha256, codes, chars, time.time()),
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO font_urls (url, sha256) VALUES (?, ?)", (font_url, sha256)
+                )
+                self._conn.commit()
+        except (sqlite3.Error, UnicodeEncodeError) as e:
+            log_debug(f"Font cache write failed for {font_url}: {e}")
+
+    def get_file_by_url(self, font_url):
+        """
+        Returns the woff2 bytes stored for font_url, or None.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT f.data FROM font_urls u JOIN font_files f ON f.sha256 = u.sha256 WHERE u.url = ?",
+                (font_url,),
+            ).fetchone()
+        return bytes(row[0]) if row else None
+
+    def put_file(self, font_url, sha256, data):
+        """
+        Stores the woff2 bytes under sha256 and points font_url at them.
+        """
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO font_files (sha256, data) VALUES (?, ?)", (sha256, data)
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO font_urls (url, sha256) VALUES (?, ?)", (font_url, sha256)
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            log_debug(f"Font file cache write failed for {font_url}: {e}")
+
+    @staticmethod
+    def _decode(row):
+        if not row:
+            return None
+        codes, chars = row
+        return dict(zip(map(ord, codes), chars))
+
+
+class NovelPageCache(_SQLiteStore):
+    """
+    Parsed novel pages ({metadata, chapters}) keyed by novel URL, together with the
+    ETag / Last-Modified the server sent, so later fetches can be conditional and a
+    304 Not Modified reuses the stored result without downloading or parsing the page.
+    """
+    FILENAME = "novels.sqlite3"
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS novel_pages ("
+        " url TEXT PRIMARY KEY,"
+        " data TEXT NOT NULL,"
+        " etag TEXT,"
+        " last_modified TEXT,"
+        " fetched_at REAL NOT NULL)",
+    )
+
+    def get(self, url):
+        """
+        Returns {novel, etag, last_modified, fetched_at} or None.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, etag, last_modified, fetched_at FROM novel_pages WHERE url = ?", (url,)
+            ).fetchone()
+        if not row:
+            return None
+        try:
+            novel = json.loads(row[0])
+        except ValueError:
+            return None
+        return {"novel": novel, "etag": row[1], "last_modified": row[2], "fetched_at": row[3]}
+
+    def put(self, url, novel, etag=None, last_modified=None):
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO novel_pages (url, data, etag, last_modified, fetched_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (url, json.dumps(novel, ensure_ascii=False), etag, last_modified, time.time()),
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            log_debug(f"Novel page cache write failed for {url}: {e}")
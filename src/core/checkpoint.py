@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+from .utils import get_save_dir, log_debug
+
+
+class DownloadCheckpoint:
+    """
+    On-disk progress of one novel download, so it survives crashes and window closes.
+    Stored as JSON lines under <save dir>/.checkpoints: the first line holds the novel
+    metadata and the selected chapters, every further line one completed chapter.
+    Appending a line per chapter keeps checkpointing cheap even for huge novels.
+    """
+
+    def __init__(self, novel_url, save_dir=None):
+        checkpoint_dir = os.path.join(save_dir or get_save_dir(), ".checkpoints")
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        key = hashlib.sha1(novel_url.encode("utf-8")).hexdigest()[:16]
+        self.novel_url = novel_url
+        self.path = os.path.join(checkpoint_dir, f"{key}.jsonl")
+        self._file = None
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def start(self, novel, chapters):
+        """
+        Begins a fresh checkpoint for novel/chapters, discarding any previous one.
+        """
+        self.close()
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"novel": novel, "chapters": chapters}, ensure_ascii=False) + "\n")
+
+    def load(self):
+        """
+        Returns {novel, chapters, completed} where completed maps chapter index -> content dict,
+        or None if there is no readable checkpoint.
+        """
+        if not self.exists():
+            return None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                header = json.loads(f.readline())
+                completed = {}
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Last line may be cut short by a crash mid-write
+                        continue
+                    completed[entry["index"]] = entry["content"]
+            return {"novel": header["novel"], "chapters": header["chapters"], "completed": completed}
+        except Exception as e:
+            log_debug(f"Failed to load checkpoint {self.path}: {e}")
+            return None
+
+    def progress(self):
+        """
+        Returns (completed, total) chapter counts, or None if there is no readable
+        checkpoint. Only the header is parsed and the chapter lines are just counted,
+        so this stays cheap however much content the checkpoint holds.
+        """
+        if not self.exists():
+            return None
+        try:
+            with open(self.path, "rb") as f:
+                total = len(json.loads(f.readline())["chapters"])
+                # A line cut short by a crash has no newline yet and is not counted
+                completed = sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b""))
+            return completed, total
+        except Exception as e:
+            log_debug(f"Failed to read checkpoint progress {self.path}: {e}")
+            return None
+
+    def record(self, index, content):
+        """
+        Appends one completed chapter and flushes it to the OS right away.
+        """
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps({"index": index, "content": content}, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        """
+        Deletes the checkpoint once the novel has been exported.
+        """
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,136 @@
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import CookieJar
+from .utils import log_debug
+
+try:
+    import browser_cookie3
+except ImportError:
+    browser_cookie3 = None
+
+FANQIE_DOMAINS = [
+    "fanqienovel.com",
+    ".fanqienovel.com",
+    "novel.snssdk.com",
+    "i.snssdk.com",
+    "passport.toutiao.com",
+]
+
+CHROME_PROFILES = ["Default"] + [f"Profile {i}" for i in range(1, 21)]
+
+# (cookie file, domains) -> (mtime, loaded at, [Cookie] for those domains)
+_db_cache = {}
+_db_lock = threading.Lock()
+
+
+def chrome_cookie_files():
+    """
+    Existing Chrome cookie databases on this machine as (cookie_file, key_file) pairs.
+    key_file is only used on Windows. cookie_file is None for browser_cookie3's own
+    default location, used when no profile directory is found.
+    """
+    base_dir = _chrome_user_data_dir()
+    files = []
+    if base_dir:
+        key_file = os.path.join(base_dir, "Local State") if sys.platform == "win32" else None
+        for prof in CHROME_PROFILES:
+            for path in (os.path.join(base_dir, prof, "Network", "Cookies"), os.path.join(base_dir, prof, "Cookies")):
+                if os.path.exists(path):
+                    files.append((path, key_file))
+    return files or [(None, None)]
+
+
+def _chrome_user_data_dir():
+    if sys.platform == "win32":
+        local = os.environ.get("LOCALAPPDATA")
+        return os.path.join(local, "Google", "Chrome", "User Data") if local else None
+    if sys.platform == "darwin":
+        return os.path.expanduser("~/Library/Application Support/Google/Chrome")
+    config = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+    return os.path.join(config, "google-chrome")
+
+
+def _db_mtime(cookie_file):
+    """
+    Last change of a cookie database, counting its journal: Chrome often commits to
+    the -journal/-wal file first.
+    """
+    if cookie_file is None:
+        return None
+    mtime = 0.0
+    for path in (cookie_file, cookie_file + "-journal", cookie_file + "-wal"):
+        try:
+            mtime = max(mtime, os.path.getmtime(path))
+        except OSError:
+            pass
+    return mtime
+
+
+def load_cookie_db(cookie_file, key_file=None, domains=FANQIE_DOMAINS, ttl=300):
+    """
+    Cookies of any of domains in one Chrome cookie database, read by browser_cookie3 in
+    a single pass for all of them. Only the matching cookies are kept, and they are
+    reused for ttl seconds as long as the database has not changed. Nothing is cached
+    when the database's mtime is unknown or it has none of those cookies yet, so a
+    retry right after logging in reads it again.
+    """
+    key = (cookie_file, tuple(domains))
+    mtime = _db_mtime(cookie_file)
+    now = time.monotonic()
+    with _db_lock:
+        cached = _db_cache.get(key)
+    if cached and cached[0] == mtime and now - cached[1] < ttl:
+        return cached[2]
+
+    if cookie_file is None:
+        jar = browser_cookie3.chrome(domain_name="")
+    else:
+        # Older browser_cookie3 releases have no key_file argument
+        try:
+            jar = browser_cookie3.chrome(domain_name="", cookie_file=cookie_file, key_file=key_file)
+        except TypeError:
+            jar = browser_cookie3.chrome(domain_name="", cookie_file=cookie_file)
+    # Drop every other site's cookies right away rather than keep them decrypted
+    cookies = [c for c in jar if any(domain in c.domain for domain in domains)]
+    if mtime is not None and cookies:
+        with _db_lock:
+            _db_cache[key] = (mtime, now, cookies)
+    return cookies
+
+
+def find_cookies(domains, ttl=300, max_workers=8):
+    """
+    Cookies for each of domains from every Chrome profile, as
+    {domain: [(browser name, CookieJar)]} with one jar per cookie database that has any.
+    A domain matches the way browser_cookie3's domain_name does: by substring of the
+    cookie's domain. Databases are read in parallel, each once for all domains.
+    """
+    found = {domain: [] for domain in domains}
+    if browser_cookie3 is None:
+        log_debug("browser_cookie3 is not installed; skipping browser cookies")
+        return found
+
+    def load(source):
+        cookie_file, key_file = source
+        try:
+            return load_cookie_db(cookie_file, key_file, domains, ttl)
+        except Exception as e:
+            log_debug(f"Chrome cookie file {cookie_file or 'default'} error: {e}")
+            return []
+
+    sources = chrome_cookie_files()
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(sources)), thread_name_prefix="CookieScan") as pool:
+        results = list(pool.map(load, sources))
+
+    for cookies in results:
+        for domain in domains:
+            jar = CookieJar()
+            for cookie in cookies:
+                if domain in cookie.domain:
+                    jar.set_cookie(cookie)
+            if len(jar) > 0:
+                found[domain].append(("Chrome", jar))
+    return found
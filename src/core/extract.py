@@ -0,0 +1,158 @@
+import html as html_lib
+import os
+import re
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree as lxml_etree
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_html = None
+
+# Fanqie serves the obfuscation font over https; http is accepted for local mirrors
+FONT_URL_RE = re.compile(r"https?://[^\"']+\.woff2")
+
+
+class BS4Extractor:
+    """
+    Reference backend: full BeautifulSoup html.parser tree, as the scraper originally did.
+    """
+    name = "bs4"
+
+    def extract_chapter(self, html):
+        """
+        Returns {content_html, font_url, blocked} for a reader page.
+        content_html is None when div.muye-reader-content is missing;
+        blocked is True when the page shows the 'no-content' placeholder.
+        """
+        soup = BeautifulSoup(html, 'html.parser')
+        content_div = soup.find('div', class_='muye-reader-content')
+        return {
+            "content_html": str(content_div) if content_div else None,
+            "font_url": _find_font_url(html),
+            "blocked": content_div is None and soup.find('div', class_='no-content') is not None
+        }
+
+    def html_to_text(self, fragment):
+        return BeautifulSoup(fragment, 'html.parser').get_text(separator='\n')
+
+
+class RegexExtractor:
+    """
+    Targeted scanner: walks the div tags to the content div and on to its matching
+    close, and extracts text by splitting on tags, so no tree is ever built.
+    Tags are matched the way html.parser reads them: '<' only opens a tag before a
+    letter, '/', '!' or '?', and a '>' inside a quoted attribute value does not close it.
+    Produces the same text as BeautifulSoup's get_text(separator='\n').
+    """
+    name = "regex"
+
+    # Attributes up to the closing '>', skipping quoted values whole
+    _ATTRS = r"""(?:[^>"']|"[^"]*"|'[^']*')*"""
+    # Div tags, plus comments, scripts and styles (whose contents are not markup) so
+    # the div walk can step over them; for those the attrs group is None
+    _DIV_TAG_RE = re.compile(
+        r"<!--.*?-->|<(script|style)(?![\w-])" + _ATTRS + r">.*?</\1\s*>"
+        r"|<(/?)div(?![\w-])(" + _ATTRS + r")>", re.I | re.S)
+    _ATTR_RE = re.compile(r"""([^\s"'>/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?""")
+    # Comments, scripts and styles are not text for get_text; keep a tag in their
+    # place so the strings on either side stay separate
+    _SKIP_RE = re.compile(r"<!--.*?-->|<(script|style)(?![\w-])" + _ATTRS + r">.*?</\1\s*>", re.I | re.S)
+    _TAG_RE = re.compile(r"<(?:/?[a-zA-Z]" + _ATTRS + r"|[!?][^>]*)>")
+
+    def extract_chapter(self, html):
+        content_html = None
+        blocked = False
+        for tag in self._DIV_TAG_RE.finditer(html):
+            if tag.group(3) is None or tag.group(2):
+                continue
+            classes = self._classes(tag.group(3))
+            if "muye-reader-content" in classes:
+                content_html = self._slice_div(html, tag)
+                break
+            blocked = blocked or "no-content" in classes
+        return {
+            "content_html": content_html,
+            "font_url": _find_font_url(html),
+            "blocked": content_html is None and blocked
+        }
+
+    def _classes(self, attrs):
+        if "class" not in attrs.lower():
+            return ()
+        for attr in self._ATTR_RE.finditer(attrs):
+            if attr.group(1).lower() == "class":
+                value = attr.group(2) or attr.group(3) or attr.group(4) or ""
+                return value.split()
+        return ()
+
+    def _slice_div(self, html, open_match):
+        if open_match.group(3).rstrip().endswith("/"):
+            # html.parser does not nest under a self-closed div
+            return html[open_match.start():open_match.end()]
+        depth = 1
+        for tag in self._DIV_TAG_RE.finditer(html, open_match.end()):
+            if tag.group(3) is None:
+                continue
+            if tag.group(2):
+                depth -= 1
+                if depth == 0:
+                    return html[open_match.start():tag.end()]
+            elif not tag.group(3).rstrip().endswith("/"):
+                depth += 1
+        # Unclosed div: like html.parser, run to the end of the document
+        return html[open_match.start():]
+
+    def html_to_text(self, fragment):
+        fragment = self._SKIP_RE.sub("<!>", fragment)
+        return "\n".join(html_lib.unescape(part) for part in self._TAG_RE.split(fragment) if part)
+
+
+class LxmlExtractor:
+    """
+    libxml2-backed backend, available when lxml is installed.
+    """
+    name = "lxml"
+
+    _CONTENT_XPATH = '//div[contains(concat(" ", normalize-space(@class), " "), " muye-reader-content ")]'
+    _NO_CONTENT_XPATH = '//div[contains(concat(" ", normalize-space(@class), " "), " no-content ")]'
+
+    def extract_chapter(self, html):
+        doc = lxml_html.fromstring(html)
+        nodes = doc.xpath(self._CONTENT_XPATH)
+        content_html = lxml_html.tostring(nodes[0], encoding='unicode', with_tail=False) if nodes else None
+        return {
+            "content_html": content_html,
+            "font_url": _find_font_url(html),
+            "blocked": not nodes and bool(doc.xpath(self._NO_CONTENT_XPATH))
+        }
+
+    def html_to_text(self, fragment):
+        root = lxml_html.fragment_fromstring(fragment, create_parent='div')
+        lxml_etree.strip_elements(root, 'script', 'style', with_tail=False)
+        return "\n".join(text for text in root.itertext() if text)
+
+
+def _find_font_url(html):
+    match = FONT_URL_RE.search(html)
+    return match.group(0) if match else None
+
+
+EXTRACTORS = {
+    "bs4": BS4Extractor,
+    "regex": RegexExtractor,
+}
+if lxml_html is not None:
+    EXTRACTORS["lxml"] = LxmlExtractor
+
+
+def get_extractor(name=None):
+    """
+    Returns an extractor by name ('regex', 'lxml' or 'bs4').
+    Defaults to FANQIE_EXTRACTOR from the environment, then regex, which benchmarks
+    fastest (see benchmarks/bench_extract.py) and needs no extra dependency.
+    """
+    name = name or os.environ.get('FANQIE_EXTRACTOR') or "regex"
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown extractor '{name}', available: {', '.join(sorted(EXTRACTORS))}")
+    return EXTRACTORS[name]()
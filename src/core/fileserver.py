@@ -0,0 +1,98 @@
+import os
+import secrets
+import shutil
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, unquote, urlsplit
+from .utils import get_save_dir, log_debug
+
+CHUNK_SIZE = 64 * 1024
+
+
+class FileServer:
+    """
+    Small HTTP endpoint that streams exported files straight from the save dir, so the
+    UI can link to a download instead of handing the whole file to Streamlit, which
+    would keep a copy in memory for the rest of the session.
+    Listens on 127.0.0.1 on a free port. Only files inside the save dir are served, and
+    every URL carries a random token so other local pages cannot browse it.
+    """
+
+    def __init__(self, save_dir=None, host="127.0.0.1", port=0):
+        self.save_dir = os.path.realpath(save_dir or get_save_dir())
+        self.token = secrets.token_urlsafe(16)
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, name="FileServer", daemon=True)
+            self._thread.start()
+            log_debug("File server listening on port %d", self.port)
+        return self
+
+    def url_for(self, path):
+        """
+        Download URL for a file in the save dir, or None if path lies outside it.
+        """
+        rel = os.path.relpath(os.path.realpath(path), self.save_dir)
+        if rel.startswith(os.pardir):
+            return None
+        return f"http://127.0.0.1:{self.port}/{self.token}/{quote(rel.replace(os.sep, '/'))}"
+
+    def resolve(self, url_path):
+        """
+        Maps a request path back to a file in the save dir. None when the token is wrong,
+        the path escapes the save dir or the file does not exist.
+        """
+        token, _, rel = urlsplit(url_path).path.lstrip("/").partition("/")
+        if not secrets.compare_digest(token, self.token) or not rel:
+            return None
+        path = os.path.realpath(os.path.join(self.save_dir, unquote(rel)))
+        if os.path.commonpath([path, self.save_dir]) != self.save_dir or not os.path.isfile(path):
+            return None
+        return path
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self._serve(send_body=True)
+
+            def do_HEAD(self):
+                self._serve(send_body=False)
+
+            def _serve(self, send_body):
+                path = server.resolve(self.path)
+                if path is None:
+                    self.send_error(404)
+                    return
+                try:
+                    f = open(path, "rb")
+                except OSError:
+                    self.send_error(404)
+                    return
+                with f:
+                    name = os.path.basename(path)
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; charset=utf-8")
+                    self.send_header("Content-Length", str(os.fstat(f.fileno()).st_size))
+                    self.send_header("Content-Disposition", f"attachment; filename*=UTF-8''{quote(name)}")
+                    self.send_header("Cache-Control", "no-store")
+                    self.end_headers()
+                    if send_body:
+                        try:
+                            shutil.copyfileobj(f, self.wfile, CHUNK_SIZE)
+                        except (BrokenPipeError, ConnectionResetError):
+                            log_debug("Download of %s aborted by client", name)
+
+            def log_message(self, format, *args):
+                return
+
+        return Handler
@@ -0,0 +1,417 @@
+import collections
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .checkpoint import DownloadCheckpoint
+from .metrics import JobMetrics, count
+from .pipeline import export_txt, plan_update, apply_update, DownloadError
+from .utils import get_save_dir, log_debug
+
+QUEUED = "queued"
+RUNNING = "running"
+EXPORTING = "exporting"
+DONE = "done"
+FAILED = "failed"
+FINISHED = (DONE, FAILED)
+
+
+class DownloadJob:
+    """
+    One novel in a DownloadQueue. The fields in to_dict are what gets persisted and
+    shown as progress; the underscored ones only live while the job is being worked on.
+    """
+
+    def __init__(self, job_id, url, resume=True, status=QUEUED, title=None, total=0,
+                 completed=0, failed=0, path=None, error=None, added_at=None, mode="download"):
+        self.id = job_id
+        self.url = url
+        # "download" (whole novel / selection) or "update" (see pipeline.update_novel)
+        self.mode = mode
+        self.resume = resume
+        self.status = status
+        self.title = title
+        self.total = total
+        self.completed = completed
+        self.failed = failed
+        self.path = path
+        self.error = error
+        self.added_at = added_at or time.time()
+        # Scraper (cookie / user agent) this job runs with; set by the queue
+        self.scraper = None
+        self.metrics = None
+        self._novel = None
+        self._chapters = None
+        self._results = None
+        self._pending = None
+        self._in_flight = 0
+        self._checkpoint = None
+        # pipeline.plan_update result for update jobs
+        self._plan = None
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "url": self.url,
+            "mode": self.mode,
+            "resume": self.resume,
+            "status": self.status,
+            "title": self.title,
+            "total": self.total,
+            "completed": self.completed,
+            "failed": self.failed,
+            "path": self.path,
+            "error": self.error,
+            "added_at": self.added_at,
+        }
+
+
+class DownloadQueue:
+    """
+    Downloads many novels at once under one global budget.
+    A single scheduler thread hands out work round-robin across the active jobs, one
+    task (novel page or chapter) at a time, so a long novel cannot starve the others.
+    At most `workers` tasks run concurrently, and every request still goes through the
+    scraper's shared rate limiter, so the site sees one steady client however many
+    novels are queued. Chapters are checkpointed per novel as usual and the queue itself
+    is saved to state_path (<save dir>/.queue.json by default), so unfinished jobs
+    continue after a restart. The file belongs to one queue: front-ends that may run at
+    the same time (UI, CLI) must each use their own.
+    Progress of every job is available from snapshot() at any time.
+    """
+    STATE_FILE = ".queue.json"
+
+    def __init__(self, scraper, save_dir=None, workers=4, state_path=None):
+        self.scraper = scraper
+        self.save_dir = save_dir or get_save_dir()
+        os.makedirs(self.save_dir, exist_ok=True)
+        self.workers = max(1, min(int(workers or 1), scraper.max_workers))
+        self.state_path = state_path or os.path.join(self.save_dir, self.STATE_FILE)
+        self.jobs = []
+        self._ids = itertools.count(1)
+        self._next_job = 0
+        self._busy = 0
+        self._stopped = False
+        self._thread = None
+        self._cond = threading.Condition()
+        self._save_lock = threading.Lock()
+        self._load()
+
+    # --- public API ---
+
+    def add(self, url, resume=True, novel=None, chapters=None, mode="download", scraper=None):
+        """
+        Queues a novel URL and returns its job. A URL that is already running is not
+        added twice; a finished one is queued again, and one still waiting in the queue
+        takes the new resume / mode / selection.
+        Pass novel (metadata) and chapters to download just that selection from an
+        already fetched novel page; it is written to a fresh checkpoint right away, so
+        the job needs no index request and survives a restart like any other.
+        mode="update" brings an exported novel up to date instead (pipeline.update_novel).
+        scraper runs this job with another identity (cookie / user agent) than the
+        queue's default one; it should share the default scraper's rate limiter.
+        """
+        with self._cond:
+            for job in self.jobs:
+                if job.url == url:
+                    if job.status in FINISHED or job.status == QUEUED:
+                        self._reset(job, resume)
+                        job.mode = mode
+                        job.scraper = scraper or self.scraper
+                        self._select(job, novel, chapters)
+                    break
+            else:
+                job = DownloadJob(next(self._ids), url, resume=resume, mode=mode)
+                job.scraper = scraper or self.scraper
+                self._select(job, novel, chapters)
+                self.jobs.append(job)
+            self._cond.notify_all()
+        self._save()
+        return job
+
+    def start(self):
+        """Starts the scheduler thread (no-op if it is already running)."""
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._schedule, name="FanqieQueue", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stops handing out new work; tasks already running are allowed to finish."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def wait(self, timeout=None):
+        """
+        Blocks until every job has finished (or the queue was stopped and its running
+        tasks are done) or timeout seconds have passed. Returns True when all jobs finished.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self._idle() and not (self._stopped and self._busy == 0):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return self._idle()
+
+    def set_workers(self, workers):
+        """Changes how many tasks may run at once, up to the scraper's max_workers."""
+        with self._cond:
+            self.workers = max(1, min(int(workers or 1), self.scraper.max_workers))
+            self._cond.notify_all()
+
+    def metrics_summary(self, job_id):
+        """JobMetrics summary of a job that ran in this process, or None."""
+        with self._cond:
+            for job in self.jobs:
+                if job.id == job_id and job.metrics is not None:
+                    return job.metrics.summary()
+        return None
+
+    def snapshot(self):
+        """Returns a list of per-job progress dicts, safe to read from any thread."""
+        with self._cond:
+            return [job.to_dict() for job in self.jobs]
+
+    def clear_finished(self, statuses=(DONE,)):
+        """Forgets jobs in the given statuses (by default the completed ones)."""
+        with self._cond:
+            self.jobs = [job for job in self.jobs if job.status not in statuses]
+        self._save()
+
+    # --- scheduling ---
+
+    def _idle(self):
+        return self._busy == 0 and all(job.status in FINISHED for job in self.jobs)
+
+    def _schedule(self):
+        # Sized for the largest budget set_workers allows; self.workers is the live limit
+        with ThreadPoolExecutor(max_workers=self.scraper.max_workers, thread_name_prefix="FanqieQueue") as pool:
+            while True:
+                with self._cond:
+                    task = None
+                    while not self._stopped:
+                        if self._busy < self.workers:
+                            task = self._next_task()
+                            if task is not None:
+                                break
+                        self._cond.wait()
+                    if task is None:
+                        return
+                    self._busy += 1
+                # Each task activates its job's metrics inside a fresh copy of this context
+                pool.submit(contextvars.copy_context().run, self._run_task, *task)
+
+    def _next_task(self):
+        """
+        Picks the next unit of work, round-robin over the jobs starting after the one
+        served last. Called with the lock held.
+        """
+        n = len(self.jobs)
+        for offset in range(n):
+            index = (self._next_job + offset) % n
+            job = self.jobs[index]
+            task = None
+            if job.status == QUEUED:
+                job.status = RUNNING
+                job.error = None
+                job.metrics = JobMetrics(job.url)
+                task = ("update" if job.mode == "update" else "index", job, None)
+            elif job.status == RUNNING and job._pending:
+                i = job._pending.popleft()
+                job._in_flight += 1
+                task = ("chapter", job, i)
+            if task is not None:
+                self._next_job = index + 1
+                return task
+        return None
+
+    def _run_task(self, kind, job, index):
+        try:
+            with job.metrics.activate():
+                if kind == "index":
+                    self._run_index(job)
+                elif kind == "update":
+                    self._run_update(job)
+                else:
+                    self._run_chapter(job, index)
+        except Exception as e:
+            log_debug("Queue task %s for %s failed: %s", kind, job.url, e)
+            self._finish(job, FAILED, error=str(e))
+        finally:
+            with self._cond:
+                self._busy -= 1
+                self._cond.notify_all()
+
+    def _run_index(self, job):
+        checkpoint = DownloadCheckpoint(job.url, self.save_dir)
+        state = checkpoint.load() if job.resume else None
+        if state:
+            novel, chapters = state["novel"], state["chapters"]
+        else:
+            data = job.scraper.get_novel(job.url)
+            if not data or not data["chapters"]:
+                self._finish(job, FAILED, error="无法获取小说信息或章节列表")
+                return
+            novel, chapters = data["metadata"], data["chapters"]
+            checkpoint.start(novel, chapters)
+
+        results = [None] * len(chapters)
+        if state:
+            for i, content in state["completed"].items():
+                if i < len(results):
+                    results[i] = content
+        pending = collections.deque(i for i in range(len(chapters)) if results[i] is None)
+
+        with self._cond:
+            job.metrics.name = job.title = novel.get("title") or job.url
+            job.total = len(chapters)
+            job.completed = len(chapters) - len(pending)
+            job.failed = 0
+            job._novel, job._chapters, job._results = novel, chapters, results
+            job._pending, job._checkpoint = pending, checkpoint
+            ready = not pending
+            self._cond.notify_all()
+        self._save()
+        if ready:
+            self._export(job)
+
+    def _run_update(self, job):
+        """
+        Works out what an incremental update has to fetch and queues those chapters like
+        any other job's, so they share the round-robin and the worker budget. A novel
+        that was never exported is downloaded in full instead.
+        """
+        try:
+            plan = plan_update(job.scraper, job.url, self.save_dir)
+        except DownloadError as e:
+            self._finish(job, FAILED, error=str(e))
+            return
+        if plan is None:
+            self._run_index(job)
+            return
+
+        chapters = plan["chapters"]
+        with self._cond:
+            job.metrics.name = job.title = plan["novel"]["title"]
+            job.total = len(chapters)
+            job.completed = job.failed = 0
+            job._novel, job._chapters, job._results = plan["novel"], chapters, [None] * len(chapters)
+            job._pending, job._plan = collections.deque(range(len(chapters))), plan
+            ready = not chapters
+            self._cond.notify_all()
+        self._save()
+        if ready:
+            self._export(job)
+
+    def _run_chapter(self, job, index):
+        content = None
+        try:
+            content = job.scraper.fetch_chapter(job._chapters[index])
+        except Exception as e:
+            log_debug("Error fetching %s: %s", job._chapters[index]['title'], e)
+        with self._cond:
+            job._in_flight -= 1
+            job._results[index] = content
+            if content:
+                job.completed += 1
+                count("chapters_fetched")
+                if job._checkpoint is not None:
+                    job._checkpoint.record(index, content)
+            else:
+                job.failed += 1
+                count("chapters_failed")
+            ready = not job._pending and job._in_flight == 0 and job.status == RUNNING
+            if ready:
+                job.status = EXPORTING
+        if ready:
+            self._export(job)
+
+    def _export(self, job):
+        if job._plan is not None:
+            self._export_update(job)
+            return
+        job._checkpoint.close()
+        try:
+            path, failed = export_txt(job.scraper, job._novel, job._chapters, job._results, self.save_dir,
+                                      job._checkpoint, job.metrics)
+        except DownloadError as e:
+            self._finish(job, FAILED, error=str(e))
+            return
+        job.path = path
+        # Partially downloaded novels are still exported; their checkpoint is kept so
+        # queueing the URL again only retries the missing chapters
+        self._finish(job, DONE if failed == 0 else FAILED,
+                     error=f"{failed} 个章节下载失败" if failed else None)
+
+    def _export_update(self, job):
+        try:
+            path, _, _, failed = apply_update(job.scraper, job._plan, job._results, self.save_dir, job.metrics)
+        except DownloadError as e:
+            self._finish(job, FAILED, error=str(e))
+            return
+        job.path = path
+        self._finish(job, DONE if failed == 0 else FAILED,
+                     error=f"{failed} 个章节下载失败" if failed else None)
+
+    def _finish(self, job, status, error=None):
+        with self._cond:
+            if job._checkpoint is not None:
+                job._checkpoint.close()
+            job.status = status
+            job.error = error
+            job._novel = job._chapters = job._results = job._pending = job._checkpoint = job._plan = None
+            self._cond.notify_all()
+        self._save()
+
+    def _select(self, job, novel, chapters):
+        if chapters is None:
+            return
+        DownloadCheckpoint(job.url, self.save_dir).start(novel, chapters)
+        job.resume = True
+        job.title = novel.get("title")
+
+    def _reset(self, job, resume):
+        job.status = QUEUED
+        job.resume = resume
+        job.total = job.completed = job.failed = 0
+        job.path = job.error = None
+
+    # --- persistence ---
+
+    def _load(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            log_debug("Failed to load queue state %s: %s", self.state_path, e)
+            return
+        for entry in entries:
+            job = DownloadJob(entry["id"], entry["url"], **{k: v for k, v in entry.items() if k not in ("id", "url")})
+            job.scraper = self.scraper
+            # Jobs interrupted mid-download start over from their checkpoint
+            if job.status not in FINISHED:
+                job.status = QUEUED
+                job.resume = True
+            self.jobs.append(job)
+        self._ids = itertools.count(max((job.id for job in self.jobs), default=0) + 1)
+
+    def _save(self):
+        entries = self.snapshot()
+        tmp_path = self.state_path + ".tmp"
+        try:
+            with self._save_lock:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(entries, f, ensure_ascii=False, indent=1)
+                os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            log_debug("Failed to save queue state: %s", e)
@@ -0,0 +1,110 @@
+import atexit
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+
+LOGGER_NAME = "fanqie"
+DEFAULT_LEVEL = "INFO"
+MAX_BYTES = 5 * 1024 * 1024
+BACKUP_COUNT = 3
+
+_lock = threading.Lock()
+_listener = None
+_logger = logging.getLogger(LOGGER_NAME)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    One JSON object per line: timestamp, level, thread, message, plus any
+    structured fields passed as extra={"fields": {...}}.
+    """
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def default_log_path():
+    """
+    ~/Desktop/fanqie_debug.log as before, or the home directory when there is no Desktop.
+    """
+    desktop = os.path.join(os.path.expanduser("~"), "Desktop")
+    base = desktop if os.path.isdir(desktop) else os.path.expanduser("~")
+    return os.path.join(base, "fanqie_debug.log")
+
+
+def get_logger():
+    """
+    Returns the application logger, setting up the background writer on first use.
+    Records are handed to a queue and written by a listener thread with size-based
+    rotation, so callers never block on file I/O. The file comes from FANQIE_LOG_FILE;
+    the level is set at import (see the end of this module) and by set_log_level.
+    """
+    global _listener
+    if _listener is not None:
+        return _logger
+    logger = _logger
+
+    with _lock:
+        if _listener is not None:
+            return logger
+        logger.propagate = False
+
+        path = os.environ.get("FANQIE_LOG_FILE") or default_log_path()
+        try:
+            handler = logging.handlers.RotatingFileHandler(
+                path, maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT, encoding="utf-8", delay=True)
+            handler.setFormatter(JsonLinesFormatter())
+        except Exception:
+            handler = logging.NullHandler()
+
+        for old in list(logger.handlers):
+            logger.removeHandler(old)
+        log_queue = queue.SimpleQueue()
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        _listener = logging.handlers.QueueListener(log_queue, handler)
+        _listener.start()
+        atexit.register(shutdown)
+    return logger
+
+
+def set_log_level(level):
+    """
+    Changes the level at runtime; 'OFF' disables logging entirely.
+    """
+    logger = _logger
+    level = str(level).upper()
+    if level == "OFF":
+        logger.setLevel(logging.CRITICAL + 1)
+    else:
+        logger.setLevel(getattr(logging, level, logging.INFO))
+
+
+def shutdown():
+    """
+    Flushes queued records and stops the writer thread.
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+# Default level from FANQIE_LOG_LEVEL (DEBUG, INFO, WARNING, ERROR or OFF), applied once
+# here so that a level chosen before the first log call is not overwritten
+set_log_level(os.environ.get("FANQIE_LOG_LEVEL", DEFAULT_LEVEL))
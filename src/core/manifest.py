@@ -0,0 +1,77 @@
+import hashlib
+import json
+import os
+import time
+from .utils import get_save_dir, log_debug
+
+
+class NovelManifest:
+    """
+    Record of what an exported TXT contains, so later runs can update it in place.
+    Stored as JSON under <save dir>/.manifests, keyed by novel URL like the checkpoints:
+    the novel metadata, the output path, the chapters ({title, url}) written to it in
+    file order, and the selected chapters that failed and are missing from it.
+    """
+
+    def __init__(self, novel_url, save_dir=None):
+        manifest_dir = os.path.join(save_dir or get_save_dir(), ".manifests")
+        os.makedirs(manifest_dir, exist_ok=True)
+        key = hashlib.sha1(novel_url.encode("utf-8")).hexdigest()[:16]
+        self.novel_url = novel_url
+        self.path = os.path.join(manifest_dir, f"{key}.json")
+
+    def load(self):
+        """
+        Returns {novel_url, novel, path, chapters, failed, updated_at}, or None when there is no
+        manifest or the file it describes is gone.
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            log_debug(f"Failed to load manifest {self.path}: {e}")
+            return None
+        if not os.path.exists(manifest.get("path") or ""):
+            return None
+        manifest.setdefault("failed", [])
+        return manifest
+
+    def save(self, novel, path, chapters, failed=()):
+        """
+        Records that path now holds chapters (a list of {title, url}) of novel, and that
+        the failed chapters were selected but could not be downloaded.
+        """
+        manifest = {
+            "novel_url": self.novel_url,
+            "novel": novel,
+            "path": path,
+            "chapters": [{"title": c["title"], "url": c["url"]} for c in chapters],
+            "failed": [{"title": c["title"], "url": c["url"]} for c in failed],
+            "updated_at": time.time(),
+        }
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            log_debug(f"Failed to save manifest {self.path}: {e}")
+
+
+def iter_manifests(save_dir=None):
+    """
+    Yields every readable manifest in the save dir, for updating a whole library.
+    """
+    manifest_dir = os.path.join(save_dir or get_save_dir(), ".manifests")
+    if not os.path.isdir(manifest_dir):
+        return
+    for name in sorted(os.listdir(manifest_dir)):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(manifest_dir, name), "r", encoding="utf-8") as f:
+                yield json.load(f)
+        except Exception as e:
+            log_debug(f"Skipping unreadable manifest {name}: {e}")
@@ -0,0 +1,107 @@
+import contextlib
+import contextvars
+import json
+import threading
+import time
+
+# Upper bounds (ms) of the histogram buckets; the last bucket is open-ended
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+_current = contextvars.ContextVar("fanqie_job_metrics", default=None)
+
+
+class JobMetrics:
+    """
+    Per-stage timings and counters for one download job.
+    Activate it around the job (with metrics.activate(): ...) and the instrumented
+    scraper code records into it through timed()/count(); with no active job those
+    calls do nothing. Safe to feed from download worker threads.
+    """
+
+    def __init__(self, name=None):
+        self.name = name
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self._samples = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def activate(self):
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self._samples.setdefault(stage, []).append(seconds)
+
+    def incr(self, counter, n=1):
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + n
+
+    def summary(self):
+        """
+        Returns a JSON-serialisable report: wall time, counters and, per stage,
+        count / total / mean / p50 / p90 / p99 / max plus a millisecond histogram.
+        """
+        with self._lock:
+            samples = {stage: sorted(values) for stage, values in self._samples.items()}
+            counters = dict(self._counters)
+        stages = {}
+        for stage, values in samples.items():
+            total = sum(values)
+            histogram = {}
+            for value in values:
+                ms = value * 1000
+                bucket = next((f"<={b}ms" for b in BUCKETS_MS if ms <= b), f">{BUCKETS_MS[-1]}ms")
+                histogram[bucket] = histogram.get(bucket, 0) + 1
+            stages[stage] = {
+                "count": len(values),
+                "total_s": round(total, 4),
+                "mean_ms": round(total / len(values) * 1000, 3),
+                "p50_ms": round(_percentile(values, 50) * 1000, 3),
+                "p90_ms": round(_percentile(values, 90) * 1000, 3),
+                "p99_ms": round(_percentile(values, 99) * 1000, 3),
+                "max_ms": round(values[-1] * 1000, 3),
+                "histogram": histogram,
+            }
+        return {
+            "job": self.name,
+            "started_at": self.started_at,
+            "wall_s": round(time.perf_counter() - self._start, 4),
+            "counters": counters,
+            "stages": stages,
+        }
+
+    def write_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+
+
+def _percentile(ordered, pct):
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+@contextlib.contextmanager
+def timed(stage):
+    """Times the enclosed block into the active job's histogram for stage."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add(stage, time.perf_counter() - start)
+
+
+def count(counter, n=1):
+    """Bumps a counter on the active job, if any."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.incr(counter, n)
@@ -0,0 +1,200 @@
+import os
+from .checkpoint import DownloadCheckpoint
+from .manifest import NovelManifest
+from .metrics import JobMetrics
+from .utils import get_save_dir, clean_filename, log_debug
+
+
+class DownloadError(Exception):
+    """Raised when a novel cannot be downloaded at all (e.g. its page did not load)."""
+
+
+def download_novel(scraper, url, save_dir=None, workers=4, resume=True, progress_callback=None):
+    """
+    Downloads one novel and exports it to <save dir>/<title>.txt without any UI.
+    Runs the same steps as the Streamlit page: fetch the novel page (or pick up an
+    unfinished checkpoint when resume is set), download every chapter, write the TXT
+    chapter by chapter, and drop the checkpoint once no chapter failed.
+    progress_callback(done, total, completed, failed) is passed to download_chapters.
+    Returns {url, title, path, total, failed, metrics}; raises DownloadError when there is
+    nothing to export.
+    """
+    save_dir = save_dir or get_save_dir()
+    os.makedirs(save_dir, exist_ok=True)
+    checkpoint = DownloadCheckpoint(url, save_dir)
+    job_metrics = JobMetrics(url)
+
+    with job_metrics.activate():
+        state = checkpoint.load() if resume else None
+        if state:
+            novel, chapters = state["novel"], state["chapters"]
+            log_debug("Resuming %s: %d/%d chapters done", url, len(state["completed"]), len(chapters))
+        else:
+            data = scraper.get_novel(url)
+            if not data or not data["chapters"]:
+                raise DownloadError(f"无法获取小说信息或章节列表: {url}")
+            novel, chapters = data["metadata"], data["chapters"]
+            checkpoint.start(novel, chapters)
+        job_metrics.name = novel.get("title") or url
+
+        results = scraper.download_chapters(chapters, workers=workers,
+                                            progress_callback=progress_callback, checkpoint=checkpoint)
+        save_path, failed_count = export_txt(scraper, novel, chapters, results, save_dir, checkpoint, job_metrics)
+
+    return {
+        "url": url,
+        "title": novel["title"],
+        "path": save_path,
+        "total": len(results),
+        "failed": failed_count,
+        "metrics": job_metrics.summary(),
+    }
+
+
+def export_txt(scraper, novel, chapters, results, save_dir, checkpoint=None, job_metrics=None):
+    """
+    Writes the downloaded chapters (results[i] belongs to chapters[i], None entries are
+    failures) to <save dir>/<title>.txt, records them in the novel's manifest, saves the
+    job metrics next to the file and removes the checkpoint when nothing failed.
+    Returns (path, failed_count); raises DownloadError when every chapter failed.
+    """
+    valid_content = [c for c in results if c]
+    failed_count = len(results) - len(valid_content)
+    if not valid_content:
+        raise DownloadError(f"所有章节下载失败: {novel.get('url') or novel['title']}")
+
+    filename = clean_filename(novel["title"])
+    save_path = os.path.join(save_dir, f"{filename}.txt")
+    with open(save_path, "w", encoding="utf-8") as f:
+        scraper.write_txt(novel, valid_content, f)
+    NovelManifest(novel["url"], save_dir).save(
+        novel, save_path, [c for c, r in zip(chapters, results) if r],
+        [c for c, r in zip(chapters, results) if not r])
+
+    if job_metrics is not None:
+        _write_metrics(job_metrics, save_path)
+    # Keep the checkpoint when chapters failed so the next run only retries those
+    if checkpoint is not None and failed_count == 0:
+        checkpoint.remove()
+    return save_path, failed_count
+
+
+def _write_metrics(job_metrics, txt_path):
+    """Saves the job metrics as <name>.metrics.json next to the exported <name>.txt."""
+    try:
+        job_metrics.write_json(os.path.splitext(txt_path)[0] + ".metrics.json")
+    except Exception as e:
+        log_debug("Failed to write metrics: %s", e)
+
+
+def update_novel(scraper, url, save_dir=None, workers=4, progress_callback=None):
+    """
+    Brings a previously exported novel up to date, fetching only what changed
+    (see plan_update for how the changes are worked out).
+    Falls back to download_novel when there is no manifest or its file is missing.
+    Returns the same dict as download_novel plus 'added' (chapters newly written).
+    """
+    save_dir = save_dir or get_save_dir()
+    job_metrics = JobMetrics(url)
+    with job_metrics.activate():
+        plan = plan_update(scraper, url, save_dir)
+        if plan is None:
+            result = download_novel(scraper, url, save_dir, workers, progress_callback=progress_callback)
+            result["added"] = result["total"] - result["failed"]
+            return result
+        job_metrics.name = plan["novel"]["title"]
+        results = scraper.download_chapters(plan["chapters"], workers=workers, progress_callback=progress_callback)
+        save_path, total, added, failed_count = apply_update(scraper, plan, results, save_dir, job_metrics)
+
+    return {
+        "url": url,
+        "title": plan["novel"]["title"],
+        "path": save_path,
+        "total": total,
+        "failed": failed_count,
+        "added": added,
+        "metrics": job_metrics.summary(),
+    }
+
+
+def plan_update(scraper, url, save_dir=None):
+    """
+    Works out what an update of an exported novel has to download.
+    The current chapter list is compared with the chapters recorded in the novel's
+    manifest, which may be the whole novel or just a range or selection of it:
+    - when those chapters are all still there, unchanged and in order, and none of the
+      selected chapters had failed, only the chapters after the last one written are
+      downloaded, to be appended to the existing TXT;
+    - otherwise (chapters renamed, removed or reordered, or gaps left by failed
+      chapters) chapters whose title changed are dropped from the chapter cache and the
+      file is to be rewritten with the manifest's chapters plus the new ones, unchanged
+      chapters being served from the cache.
+    Returns None when there is no manifest (or its file is gone), otherwise
+    {url, novel, manifest, chapters, append}: download chapters, then hand their
+    results to apply_update. Raises DownloadError when the novel page does not load.
+    """
+    manifest = NovelManifest(url, save_dir or get_save_dir()).load()
+    if not manifest:
+        return None
+
+    data = scraper.get_novel(url)
+    if not data or not data["chapters"]:
+        raise DownloadError(f"无法获取小说信息或章节列表: {url}")
+    novel, chapters = data["metadata"], data["chapters"]
+    positions = {c["url"]: i for i, c in enumerate(chapters)}
+    known = manifest["chapters"]
+    known_at = [positions.get(c["url"]) for c in known]
+    append = (
+        not manifest["failed"]
+        and None not in known_at
+        and all(chapters[i]["title"] == c["title"] for i, c in zip(known_at, known))
+        and all(a < b for a, b in zip(known_at, known_at[1:]))
+    )
+
+    if append:
+        selection = chapters[known_at[-1] + 1:] if known_at else chapters
+        log_debug("Update %s: %d new chapters", url, len(selection))
+    else:
+        old_titles = {c["url"]: c["title"] for c in known}
+        wanted = set(old_titles) | {c["url"] for c in manifest["failed"]}
+        last = max((positions[u] for u in wanted if u in positions), default=-1)
+        selection = [c for i, c in enumerate(chapters) if c["url"] in wanted or i > last]
+        changed = [c for c in selection if c["url"] in old_titles and old_titles[c["url"]] != c["title"]]
+        if scraper.chapter_cache is not None:
+            for chapter in changed:
+                scraper.chapter_cache.delete(chapter["url"])
+        log_debug("Update %s: chapter list changed (%d renamed), rewriting %d chapters",
+                  url, len(changed), len(selection))
+    return {"url": url, "novel": novel, "manifest": manifest, "chapters": selection, "append": append}
+
+
+def apply_update(scraper, plan, results, save_dir=None, job_metrics=None):
+    """
+    Writes an update planned by plan_update; results[i] belongs to plan["chapters"][i]
+    (None for a failure). Returns (path, total chapters in the file's selection,
+    chapters newly written, failed count); raises DownloadError like export_txt.
+    """
+    save_dir = save_dir or get_save_dir()
+    novel, manifest, chapters = plan["novel"], plan["manifest"], plan["chapters"]
+    if plan["append"]:
+        # Append only the unbroken run of successes so the file stays in chapter order;
+        # anything after a failure is retried (mostly from cache) on the next update
+        appended = []
+        for content in results:
+            if not content:
+                break
+            appended.append(content)
+        if appended:
+            with open(manifest["path"], "a", encoding="utf-8") as f:
+                scraper.append_txt(appended, f)
+            NovelManifest(plan["url"], save_dir).save(
+                novel, manifest["path"], manifest["chapters"] + chapters[:len(appended)])
+        if job_metrics is not None:
+            _write_metrics(job_metrics, manifest["path"])
+        total = len(manifest["chapters"]) + len(chapters)
+        return manifest["path"], total, len(appended), len(results) - len(appended)
+
+    old_urls = {c["url"] for c in manifest["chapters"]}
+    save_path, failed_count = export_txt(scraper, novel, chapters, results, save_dir, job_metrics=job_metrics)
+    added = sum(1 for c, r in zip(chapters, results) if r and c["url"] not in old_urls)
+    return save_path, len(chapters), added, failed_count
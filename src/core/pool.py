@@ -0,0 +1,51 @@
+import threading
+import time
+from .ratelimit import RateLimiter
+from .scraper import FanqieScraper
+from .utils import log_debug
+
+
+class ScraperPool:
+    """
+    Long-lived FanqieScraper instances keyed by (cookie, user agent).
+    Reusing a scraper keeps its session's keep-alive connections, its headers and its
+    in-memory font maps warm between operations instead of rebuilding them per click.
+    Scrapers idle for longer than ttl seconds are closed and dropped, and at most
+    max_size identities are kept (least recently used goes first).
+    Every scraper is built with the same extra arguments, so they share one rate
+    limiter (the site sees a single client) and whatever caches are passed in.
+    """
+
+    def __init__(self, ttl=900, max_size=8, **scraper_kwargs):
+        self.ttl = ttl
+        self.max_size = max_size
+        scraper_kwargs.setdefault("rate_limiter", RateLimiter())
+        self.scraper_kwargs = scraper_kwargs
+        # (cookie, user agent) -> [scraper, last used]
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, cookie_str=None, user_agent=None):
+        key = (cookie_str or "", user_agent or "")
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                scraper = FanqieScraper(cookie_str or None, user_agent or None, **self.scraper_kwargs)
+                entry = self._entries[key] = [scraper, now]
+                while len(self._entries) > self.max_size:
+                    oldest = min(self._entries, key=lambda k: self._entries[k][1])
+                    self._drop(oldest)
+            entry[1] = now
+            return entry[0]
+
+    def _evict_idle(self, now):
+        for key in [k for k, (_, used) in self._entries.items() if now - used > self.ttl]:
+            self._drop(key)
+
+    def _drop(self, key):
+        scraper, _ = self._entries.pop(key)
+        log_debug("Closing idle scraper session (pool size %d)", len(self._entries))
+        # A job still holding the scraper keeps working: requests reopens connections on demand
+        scraper.session.close()
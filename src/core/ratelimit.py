@@ -0,0 +1,89 @@
+import asyncio
+import threading
+import time
+from .logger import get_logger
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every worker of a scraper.
+    Allows short bursts, keeps a steady request rate and adapts it AIMD-style:
+    the rate grows additively while responses look healthy and is cut
+    multiplicatively on throttling signals (429/5xx, blocked pages, errors,
+    responses much slower than usual).
+    """
+
+    def __init__(self, rate=3.0, burst=5, min_rate=0.2, max_rate=8.0,
+                 increase=0.1, decrease=0.5, slow_factor=3.0):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.slow_factor = slow_factor
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._last_decrease = 0.0
+        # Exponentially weighted average of healthy response times
+        self._avg_latency = None
+        self._samples = 0
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """
+        Takes one token and returns how long the caller has to wait for it.
+        Tokens may go negative, which queues callers fairly without a condition variable.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        """Blocks the calling thread until a request may be sent."""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Coroutine version of acquire."""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def record(self, status=None, elapsed=None, blocked=False):
+        """
+        Feeds one response back into the limiter.
+        status: HTTP status code, or None if the request raised
+        elapsed: response time in seconds
+        blocked: the page came back without content (e.g. 'no-content')
+        """
+        throttled = blocked or status is None or status == 429 or status >= 500
+        with self._lock:
+            if not throttled and elapsed is not None:
+                if self._samples >= 5 and elapsed > self.slow_factor * self._avg_latency:
+                    throttled = True
+                else:
+                    self._samples += 1
+                    if self._avg_latency is None:
+                        self._avg_latency = elapsed
+                    else:
+                        self._avg_latency = 0.8 * self._avg_latency + 0.2 * elapsed
+
+            if throttled:
+                now = time.monotonic()
+                # One cut per second at most, so a burst of failures from
+                # requests already in flight does not collapse the rate
+                if now - self._last_decrease >= 1.0:
+                    self._last_decrease = now
+                    self.rate = max(self.min_rate, self.rate * self.decrease)
+                    self._tokens = min(self._tokens, 0.0)
+                    get_logger().info("Rate limiter backing off to %.2f req/s", self.rate,
+                                      extra={"fields": {"status": status, "blocked": blocked}})
+            else:
+                self.rate = min(self.max_rate, self.rate + self.increase)
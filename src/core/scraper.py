@@ -1,13 +1,20 @@
 import requests
 from bs4 import BeautifulSoup
+import base64
+import contextvars
+import hashlib
 import json
 import requests
-import websocket
-import re
 import os
-import tempfile
-from fontTools.ttLib import TTFont
-from .utils import get_headers, download_font_as_base64, clean_filename, log_debug
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from .utils import get_headers, clean_filename, log_debug
+from .ratelimit import RateLimiter
+from .extract import get_extractor
+from .metrics import timed, count
+from .singleflight import SingleFlight
 
 # Static mapping string for Fanqie font de-obfuscation
 # Derived from reverse engineering of the font glyph order
@@ -34,122 +41,297 @@ FANQIE_CHAR_MAP = (
 )
 
 class FanqieScraper:
-    def __init__(self, cookie_str=None, user_agent=None):
+    # Politeness cap: never run more than this many chapter requests at once
+    MAX_WORKERS = 8
+
+    def __init__(self, cookie_str=None, user_agent=None, max_workers=None, rate_limiter=None, chapter_cache=None, font_cache=None, extractor=None, novel_cache=None):
         self.headers = get_headers(cookie_str, user_agent)
         self.base_url = "https://fanqienovel.com"
+        self.max_workers = max_workers or self.MAX_WORKERS
+        # Shared politeness budget for chapter requests
+        self.rate_limiter = rate_limiter or RateLimiter()
+        # Reader-page parser backend (lxml / regex / bs4), see extract.py
+        self.extractor = extractor or get_extractor()
+        # Optional on-disk ChapterCache; hits are served without network access
+        self.chapter_cache = chapter_cache
+        # Optional NovelPageCache; novel pages are re-fetched conditionally against it
+        self.novel_cache = novel_cache
         # Cache for font maps: font_url -> map_dict
         self.font_maps = {}
+        # Optional on-disk FontMapCache shared across scraper instances and runs
+        self.font_cache = font_cache
+        # Compiled str.translate tables: font_url -> table
+        self.font_tables = {}
+        # Raw woff2 bytes kept for exports that embed the font: font_url -> bytes
+        self.font_files = {}
+        # Concurrent lookups of the same font share one download and parse
+        self._font_flight = SingleFlight()
         # Use a session for persistence
         self.session = requests.Session()
         self.session.headers.update(self.headers)
+        # Size the connection pool so concurrent workers reuse keep-alive connections
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
-    def get_novel_metadata(self, url):
+    def get_novel(self, url):
         """
-        Fetches novel title, author, and cover image.
+        Fetches the novel page once and returns {metadata, chapters}, or None on failure.
+        get_novel_metadata and get_chapter_list are thin wrappers around it.
+        With a novel_cache the request carries If-None-Match / If-Modified-Since from the
+        last response, and a 304 returns the stored result without parsing anything.
         """
         try:
-            response = self.session.get(url)
+            cached = self._get_cached_novel(url)
+            with timed("fetch_index"):
+                response = self.session.get(url, headers=self._validator_headers(cached))
+            if response.status_code == 304 and cached:
+                log_debug("Novel page not modified: %s", url)
+                count("index_not_modified")
+                return cached["novel"]
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            title = soup.find('h1').text.strip() if soup.find('h1') else "Unknown Title"
-            author = soup.find('span', class_='author-name-text').text.strip() if soup.find('span', class_='author-name-text') else "Unknown Author"
-            
-            # Try to find cover image
-            cover_img = soup.find('img', class_='novel-cover-image')
-            cover_url = cover_img['src'] if cover_img else None
-
-            return {
-                "title": title,
-                "author": author,
-                "cover_url": cover_url,
-                "url": url
-            }
+            with timed("parse_index"):
+                novel = self._parse_novel_page(response.text, url)
+            self._store_novel(url, novel, response.headers)
+            return novel
         except Exception as e:
-            print(f"Error fetching metadata: {e}")
+            print(f"Error fetching novel: {e}")
             return None
 
+    def _get_cached_novel(self, url):
+        if self.novel_cache is None:
+            return None
+        return self.novel_cache.get(url)
+
+    @staticmethod
+    def _validator_headers(cached):
+        """
+        Conditional request headers for a cached novel page (empty without one).
+        """
+        headers = {}
+        if cached:
+            if cached["etag"]:
+                headers['If-None-Match'] = cached["etag"]
+            if cached["last_modified"]:
+                headers['If-Modified-Since'] = cached["last_modified"]
+        return headers
+
+    def _store_novel(self, url, novel, response_headers):
+        etag = response_headers.get('ETag')
+        last_modified = response_headers.get('Last-Modified')
+        # Without validators the page could never be revalidated, so do not keep it
+        if self.novel_cache is not None and (etag or last_modified) and novel["chapters"]:
+            self.novel_cache.put(url, novel, etag, last_modified)
+
+    def _parse_novel_page(self, html, url):
+        soup = BeautifulSoup(html, 'html.parser')
+        return {
+            "metadata": self._parse_metadata(soup, url),
+            "chapters": self._parse_chapter_list(soup)
+        }
+
+    def get_novel_metadata(self, url):
+        """
+        Fetches novel title, author, and cover image.
+        """
+        novel = self.get_novel(url)
+        return novel["metadata"] if novel else None
+
+    def _parse_metadata(self, soup, url):
+        title = soup.find('h1').text.strip() if soup.find('h1') else "Unknown Title"
+        author = soup.find('span', class_='author-name-text').text.strip() if soup.find('span', class_='author-name-text') else "Unknown Author"
+
+        # Try to find cover image
+        cover_img = soup.find('img', class_='novel-cover-image')
+        cover_url = cover_img['src'] if cover_img else None
+
+        return {
+            "title": title,
+            "author": author,
+            "cover_url": cover_url,
+            "url": url
+        }
+
     def get_chapter_list(self, url):
         """
         Fetches list of chapters (title and url).
         """
-        try:
-            response = self.session.get(url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            chapters = []
-            # This selector might need adjustment based on actual page structure
-            # Based on research: div.chapter-item a
-            chapter_items = soup.select('.chapter-item a')
-            
-            for item in chapter_items:
-                title = item.text.strip()
-                link = item['href']
-                if not link.startswith('http'):
-                    link = self.base_url + link
-                chapters.append({"title": title, "url": link})
-                
-            return chapters
-        except Exception as e:
-            print(f"Error fetching chapter list: {e}")
-            return []
+        novel = self.get_novel(url)
+        return novel["chapters"] if novel else []
+
+    def _parse_chapter_list(self, soup):
+        chapters = []
+        # This selector might need adjustment based on actual page structure
+        # Based on research: div.chapter-item a
+        chapter_items = soup.select('.chapter-item a')
 
-    def get_chapter_content(self, chapter_url):
+        for item in chapter_items:
+            title = item.text.strip()
+            link = item['href']
+            if not link.startswith('http'):
+                link = self.base_url + link
+            chapters.append({"title": title, "url": link})
+
+        return chapters
+
+    def get_chapter_content(self, chapter_url, use_cache=True):
         """
         Fetches chapter content and font URL.
+        Served from self.chapter_cache when possible; otherwise waits for the shared
+        rate limiter, reports the outcome back to it and stores the result in the cache.
         """
-        log_debug(f"Fetching chapter: {chapter_url}")
+        if use_cache:
+            cached = self._get_cached_chapter(chapter_url)
+            if cached:
+                return cached
+
+        log_debug("Fetching chapter: %s", chapter_url)
+        self.rate_limiter.acquire()
+        start = time.monotonic()
+        status = None
         try:
-            response = self.session.get(chapter_url)
-            log_debug(f"Response Status: {response.status_code}")
+            with timed("fetch"):
+                response = self.session.get(chapter_url, timeout=15)
+            status = response.status_code
+            log_debug("Response Status: %s", response.status_code)
             response.raise_for_status()
-            html = response.text
-            log_debug(f"Response Length: {len(html)}")
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # Extract content div
-            # Based on research: div.muye-reader-content
-            content_div = soup.find('div', class_='muye-reader-content')
-            if not content_div:
-                log_debug("Content div not found")
-                
-                # Debug: Save error page
-                try:
-                    debug_dir = os.path.join(os.path.expanduser("~"), "Desktop", "fanqie_errors")
-                    os.makedirs(debug_dir, exist_ok=True)
-                    chapter_id = chapter_url.split('/')[-1]
-                    with open(os.path.join(debug_dir, f"error_{chapter_id}.html"), 'w', encoding='utf-8') as f:
-                        f.write(html)
-                    log_debug(f"Saved error page to error_{chapter_id}.html")
-                except:
-                    pass
-                
-                # Fallback: check for 'no-content'
-                if soup.find('div', class_='no-content'):
-                    log_debug("Found 'no-content' div - VIP blocked?")
-                    print(f"Content blocked for {chapter_url}. Cookie might be required.")
-                return None
-
-            log_debug("Content div found successfully")
-            # Extract font URL
-            font_url = None
-            font_match = re.search(r"https://[^\"']+\.woff2", html)
-            if font_match:
-                font_url = font_match.group(0)
-                log_debug(f"Font URL found: {font_url}")
-            else:
-                log_debug("Font URL NOT found")
-
-            return {
-                "content_html": str(content_div),
-                "font_url": font_url
-            }
+            with timed("parse"):
+                content = self._parse_chapter_page(response.text, chapter_url)
+            self.rate_limiter.record(status, time.monotonic() - start, blocked=content is None)
+            if content and self.chapter_cache is not None:
+                self.chapter_cache.put(chapter_url, content, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+            return content
         except Exception as e:
-            log_debug(f"Error fetching chapter content: {e}")
+            self.rate_limiter.record(status, time.monotonic() - start)
+            log_debug("Error fetching chapter content: %s", e)
             print(f"Error fetching chapter content: {e}")
             return None
 
+    def _get_cached_chapter(self, chapter_url):
+        if self.chapter_cache is None:
+            return None
+        cached = self.chapter_cache.get(chapter_url)
+        if not cached:
+            return None
+        log_debug("Chapter cache hit: %s", chapter_url)
+        count("chapter_cache_hits")
+        return {
+            "content_html": cached["content_html"],
+            "font_url": cached["font_url"]
+        }
+
+    def _parse_chapter_page(self, html, chapter_url):
+        """
+        Extracts the content div and font URL from a reader page.
+        Returns {content_html, font_url} or None if the page has no content.
+        """
+        log_debug("Response Length: %d", len(html))
+        page = self.extractor.extract_chapter(html)
+
+        # Extract content div
+        # Based on research: div.muye-reader-content
+        if not page["content_html"]:
+            log_debug("Content div not found")
+
+            # Debug: Save error page
+            try:
+                debug_dir = os.path.join(os.path.expanduser("~"), "Desktop", "fanqie_errors")
+                os.makedirs(debug_dir, exist_ok=True)
+                chapter_id = chapter_url.split('/')[-1]
+                with open(os.path.join(debug_dir, f"error_{chapter_id}.html"), 'w', encoding='utf-8') as f:
+                    f.write(html)
+                log_debug("Saved error page to error_%s.html", chapter_id)
+            except:
+                pass
+
+            # Fallback: check for 'no-content'
+            if page["blocked"]:
+                log_debug("Found 'no-content' div - VIP blocked?")
+                print(f"Content blocked for {chapter_url}. Cookie might be required.")
+            return None
+
+        log_debug("Content div found successfully")
+        font_url = page["font_url"]
+        if font_url:
+            log_debug("Font URL found: %s", font_url)
+        else:
+            log_debug("Font URL NOT found")
+
+        return {
+            "content_html": page["content_html"],
+            "font_url": font_url
+        }
+
+    def download_chapters(self, chapters, workers=4, progress_callback=None, checkpoint=None):
+        """
+        Fetches many chapters concurrently over the shared session.
+        chapters: list of dicts {title, url}
+        Returns a list in the same order as chapters; each item is the content dict
+        (with 'title' added) or None if the chapter failed.
+        progress_callback(done, total, completed, failed) is called from the calling thread.
+        Request pacing is left to self.rate_limiter, which all workers share.
+        checkpoint: optional DownloadCheckpoint; chapters it already holds are not fetched
+        again and every newly completed chapter is appended to it.
+        """
+        total = len(chapters)
+        results = [None] * total
+        if total == 0:
+            return results
+
+        if checkpoint is not None:
+            state = checkpoint.load()
+            if state:
+                for i, content in state["completed"].items():
+                    if i < total:
+                        results[i] = content
+        pending = [i for i in range(total) if results[i] is None]
+
+        completed_count = total - len(pending)
+        failed_count = 0
+        if completed_count and progress_callback:
+            progress_callback(completed_count, total, completed_count, failed_count)
+        if not pending:
+            return results
+
+        workers = max(1, min(int(workers or 1), self.max_workers, len(pending)))
+        log_debug("Downloading %d/%d chapters with %d workers", len(pending), total, workers)
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="FanqieFetch") as pool:
+                # Each task runs in a copy of the caller's context so the active JobMetrics follows it
+                futures = {pool.submit(contextvars.copy_context().run, self.fetch_chapter, chapters[i]): i for i in pending}
+                for future in as_completed(futures):
+                    i = futures[future]
+                    try:
+                        results[i] = future.result()
+                    except Exception as e:
+                        log_debug("Error fetching %s: %s", chapters[i]['title'], e)
+                    if results[i]:
+                        completed_count += 1
+                        count("chapters_fetched")
+                        if checkpoint is not None:
+                            checkpoint.record(i, results[i])
+                    else:
+                        failed_count += 1
+                        count("chapters_failed")
+                    if progress_callback:
+                        progress_callback(completed_count + failed_count, total, completed_count, failed_count)
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+
+        return results
+
+    def fetch_chapter(self, chapter):
+        """
+        Fetches one {title, url} chapter, falling back to CDP when enabled.
+        Returns the content dict with 'title' added, or None.
+        """
+        content = self.get_chapter_content(chapter['url']) or self.get_chapter_content_cdp(chapter['url'])
+        if content:
+            content['title'] = chapter['title']
+        return content
+
     def get_chapter_content_cdp(self, chapter_url):
         # Default disabled: only use when explicitly enabled via env FANQIE_CDP_DOWNLOAD
         if os.environ.get('FANQIE_CDP_DOWNLOAD') not in ('1', 'true', 'True'):
@@ -162,6 +344,8 @@ class FanqieScraper:
             browser_ws = version.get('webSocketDebuggerUrl')
             if not browser_ws:
                 return None
+            # Imported here so normal (non-CDP) runs do not pay for it at startup
+            import websocket
             ws = websocket.create_connection(browser_ws, timeout=5)
             ws.send(json.dumps({"id": 1, "method": "Target.createTarget", "params": {"url": "about:blank"}}))
             create_res = json.loads(ws.recv())
@@ -213,70 +397,183 @@ class FanqieScraper:
     def _get_font_map(self, font_url):
         """
         Downloads and parses the woff2 font to create a mapping from obfuscated code to real char.
+        Safe to call from many threads: concurrent callers for one font_url share a single
+        download and parse.
         """
         if not font_url:
             return {}
         
         if font_url in self.font_maps:
             return self.font_maps[font_url]
+        return self._font_flight.do(font_url, self._load_font_map, font_url)
+
+    def _load_font_map(self, font_url):
+        """
+        Font cache lookup, then download and parse; runs once per font_url at a time.
+        """
+        # A flight that finished just before this one started may already have stored it
+        if font_url in self.font_maps:
+            return self.font_maps[font_url]
+
+        mapping = self._get_cached_font_map(font_url)
+        if mapping:
+            return mapping
 
         try:
-            print(f"Downloading font: {font_url}")
+            return self._store_font_map(font_url, self._download_font(font_url))
+        except Exception as e:
+            print(f"Error processing font {font_url}: {e}")
+            return {}
+
+    def _download_font(self, font_url):
+        print(f"Downloading font: {font_url}")
+        with timed("font_download"):
             resp = self.session.get(font_url, timeout=10)
-            resp.raise_for_status()
-            
-            with tempfile.NamedTemporaryFile(suffix='.woff2', delete=False) as tmp:
-                tmp.write(resp.content)
-                tmp_path = tmp.name
-            
-            # Ensure brotli is importable before using fontTools with woff2
-            try:
-                import brotli
-            except ImportError:
-                print("Error: brotli module not found. WOFF2 decompression will fail.")
-                # We can return a special dict to indicate error, but for now just log it.
+        resp.raise_for_status()
+        return resp.content
+
+    def get_font_bytes(self, font_url):
+        """
+        Returns the woff2 bytes of font_url, or None if they cannot be had.
+        Served from memory or the font cache when the font was seen before (any
+        _get_font_map download keeps them); otherwise downloaded once over the session.
+        """
+        if not font_url:
+            return None
+        font_bytes = self.font_files.get(font_url)
+        if font_bytes is None and self.font_cache is not None:
+            font_bytes = self.font_cache.get_file_by_url(font_url)
+            if font_bytes is not None:
+                self.font_files[font_url] = font_bytes
+        if font_bytes is None:
+            font_bytes = self._font_flight.do(("file", font_url), self._load_font_file, font_url)
+        return font_bytes
+
+    def _load_font_file(self, font_url):
+        if font_url in self.font_files:
+            return self.font_files[font_url]
+        try:
+            font_bytes = self._download_font(font_url)
+        except Exception as e:
+            print(f"Error downloading font: {e}")
+            return None
+        self._store_font_file(font_url, hashlib.sha256(font_bytes).hexdigest(), font_bytes)
+        return font_bytes
+
+    def _store_font_file(self, font_url, digest, font_bytes):
+        self.font_files[font_url] = font_bytes
+        if self.font_cache is not None:
+            self.font_cache.put_file(font_url, digest, font_bytes)
 
+    def _get_translation_table(self, font_url):
+        """
+        Returns the font map compiled into a str.translate table, or None if the map is empty.
+        """
+        table = self.font_tables.get(font_url)
+        if table is None:
+            mapping = self._get_font_map(font_url)
+            if not mapping:
+                return None
+            table = self._compile_translation_table(mapping)
+            self.font_tables[font_url] = table
+        return table
+
+    @staticmethod
+    def _compile_translation_table(mapping):
+        """
+        Compiles code -> char into a list indexed by code point for str.translate.
+        Indexing a list is about twice as fast as the dict str.maketrans builds, because
+        unmapped characters don't raise KeyError; code points past the end raise
+        IndexError and are left unchanged.
+        """
+        table = list(range(max(mapping) + 1))
+        for code, char in mapping.items():
+            table[code] = char
+        return table
+
+    def _get_cached_font_map(self, font_url):
+        """
+        Looks font_url up in the on-disk font cache and promotes a hit to self.font_maps.
+        """
+        if self.font_cache is None:
+            return None
+        mapping = self.font_cache.get_by_url(font_url)
+        if mapping:
+            log_debug("Font cache hit: %s", font_url)
+            self.font_maps[font_url] = mapping
+        return mapping
+
+    def _store_font_map(self, font_url, font_bytes):
+        """
+        Parses downloaded font bytes and caches the resulting mapping under font_url.
+        Fonts already parsed under another URL are recognised by their SHA-256 and not parsed again.
+        """
+        digest = hashlib.sha256(font_bytes).hexdigest()
+        self._store_font_file(font_url, digest, font_bytes)
+        mapping = self.font_cache.get_by_hash(digest) if self.font_cache is not None else None
+        if mapping:
+            log_debug("Font cache hit by hash: %s", digest)
+        else:
             try:
-                font = TTFont(tmp_path)
-                
-                # New Logic: Map based on Glyph Order and Static List
-                glyph_order = font.getGlyphOrder()
-                cmap = font.getBestCmap()
-                mapping = {}
-                
-                # Map GlyphName -> RealChar using FANQIE_CHAR_MAP
-                # Glyph 0 is .notdef, so Glyph 1 corresponds to index 0 in map string
-                glyph_name_to_char = {}
-                for i, name in enumerate(glyph_order):
-                    if i == 0: continue # Skip .notdef
-                    if i - 1 < len(FANQIE_CHAR_MAP):
-                        glyph_name_to_char[name] = FANQIE_CHAR_MAP[i - 1]
-                
-                # Map Code -> GlyphName -> RealChar
-                for code, name in cmap.items():
-                    if name in glyph_name_to_char:
-                        mapping[code] = glyph_name_to_char[name]
-                    elif name.startswith('uni'):
-                        # Fallback for standard names if mixed
-                        try:
-                            mapping[code] = chr(int(name[3:], 16))
-                        except:
-                            pass
-                
-                font.close()
-                self.font_maps[font_url] = mapping
-                return mapping
+                with timed("font_parse"):
+                    mapping = self._parse_font(font_bytes)
             except Exception as font_err:
                 print(f"Error parsing font with TTFont: {font_err}")
-                self.font_maps[font_url] = {} # Avoid retrying
-                return {}
-            finally:
-                 if os.path.exists(tmp_path):
-                    os.remove(tmp_path)
+                mapping = {} # Avoid retrying
+        if mapping and self.font_cache is not None:
+            self.font_cache.put(font_url, digest, mapping)
+        self.font_maps[font_url] = mapping
+        return mapping
 
-        except Exception as e:
-            print(f"Error processing font {font_url}: {e}")
-            return {}
+    def _parse_font(self, font_bytes):
+        """
+        Builds the obfuscated code -> real char mapping from woff2 font bytes.
+        The font is read straight from memory and opened lazily: only the tables behind
+        the glyph order and the cmap are decompiled, glyph outlines are never touched.
+        """
+        # Ensure brotli is importable before using fontTools with woff2
+        try:
+            import brotli
+        except ImportError:
+            print("Error: brotli module not found. WOFF2 decompression will fail.")
+            # We can return a special dict to indicate error, but for now just log it.
+
+        # Deferred: fontTools is only needed when a font has to be parsed
+        from fontTools.ttLib import TTFont
+        font = TTFont(io.BytesIO(font_bytes), lazy=True)
+        try:
+            return self._build_font_map(font.getGlyphOrder(), font.getBestCmap())
+        finally:
+            font.close()
+
+    @staticmethod
+    def _build_font_map(glyph_order, cmap):
+        """
+        Maps each code in cmap to its real char via the glyph's position in glyph_order.
+        """
+        # New Logic: Map based on Glyph Order and Static List
+        mapping = {}
+
+        # Map GlyphName -> RealChar using FANQIE_CHAR_MAP
+        # Glyph 0 is .notdef, so Glyph 1 corresponds to index 0 in map string
+        glyph_name_to_char = {}
+        for i, name in enumerate(glyph_order):
+            if i == 0: continue # Skip .notdef
+            if i - 1 < len(FANQIE_CHAR_MAP):
+                glyph_name_to_char[name] = FANQIE_CHAR_MAP[i - 1]
+
+        # Map Code -> GlyphName -> RealChar
+        for code, name in cmap.items():
+            if name in glyph_name_to_char:
+                mapping[code] = glyph_name_to_char[name]
+            elif name.startswith('uni'):
+                # Fallback for standard names if mixed
+                try:
+                    mapping[code] = chr(int(name[3:], 16))
+                except:
+                    pass
+
+        return mapping
 
     def generate_html(self, novel_data, chapters_content):
         """
@@ -284,9 +581,12 @@ class FanqieScraper:
         chapters_content: list of dicts {title, content_html, font_url}
         """
         # Use the font from the first chapter (assuming consistent font for the novel/session)
+        # The bytes come from the font the scraper already fetched, not a second download
         font_base64 = None
         if chapters_content and chapters_content[0].get('font_url'):
-            font_base64 = download_font_as_base64(chapters_content[0]['font_url'])
+            font_bytes = self.get_font_bytes(chapters_content[0]['font_url'])
+            if font_bytes:
+                font_base64 = base64.b64encode(font_bytes).decode('utf-8')
 
         font_face_css = ""
         if font_base64:
@@ -348,48 +648,65 @@ class FanqieScraper:
             </div>
             """
             
-        return html_template.format(chapters_html=chapters_html)
+        # str.format would trip over the braces of the inlined CSS
+        return html_template.replace("{chapters_html}", chapters_html)
 
     def generate_txt(self, novel_data, chapters_content):
         """
         Generates a TXT file with de-obfuscated content.
+        Prefer write_txt for large novels; this joins the whole file in memory.
         """
-        txt_content = f"{novel_data['title']}\n作者：{novel_data['author']}\n\n"
-        
+        return "".join(self.iter_txt(novel_data, chapters_content))
+
+    def write_txt(self, novel_data, chapters_content, fp):
+        """
+        Streams the TXT export into an open text file handle, one chapter at a time.
+        chapters_content may be any iterable, so peak memory stays at one chapter.
+        """
+        with timed("export"):
+            for piece in self.iter_txt(novel_data, chapters_content):
+                fp.write(piece)
+
+    def append_txt(self, chapters_content, fp):
+        """
+        Streams further chapters onto the end of an existing TXT export (no header).
+        """
+        with timed("export"):
+            for chapter in chapters_content:
+                fp.write(self._chapter_txt(chapter))
+
+    def iter_txt(self, novel_data, chapters_content):
+        """
+        Yields the TXT export piece by piece: the header, then one string per chapter.
+        """
+        yield f"{novel_data['title']}\n作者：{novel_data['author']}\n\n"
+
         for chapter in chapters_content:
-            txt_content += f"{chapter['title']}\n\n"
-            
-            raw_html = chapter.get('content_html')
-            if not raw_html:
-                 txt_content += "[章节内容获取失败，可能需要Cookie或为付费章节]\n\n" + "="*20 + "\n\n"
-                 continue
+            yield self._chapter_txt(chapter)
 
-            soup = BeautifulSoup(raw_html, 'html.parser')
-            text = soup.get_text(separator='\n')
-            
-            # De-obfuscate if font_url is present
-            font_url = chapter.get('font_url')
-            if font_url:
-                try:
-                    mapping = self._get_font_map(font_url)
-                    if mapping:
-                        # Replace characters
-                        new_text = ""
-                        for char in text:
-                            code = ord(char)
-                            if code in mapping:
-                                new_text += mapping[code]
-                            else:
-                                new_text += char
-                        text = new_text
-                    else:
-                        # If mapping is empty but font_url exists, it likely failed.
-                        text = f"[系统提示：字体解密失败 (Mapping Empty)]\n[Font URL: {font_url}]\n" + text
-                except Exception as e:
-                    import traceback
-                    tb = traceback.format_exc()
-                    text = f"[系统提示：字体解密发生严重错误]\n[错误信息: {str(e)}]\n[Traceback: {tb}]\n" + text
-            
-            txt_content += text + "\n\n" + "="*20 + "\n\n"
-            
-        return txt_content
+    def _chapter_txt(self, chapter):
+        raw_html = chapter.get('content_html')
+        if not raw_html:
+            return f"{chapter['title']}\n\n" + "[章节内容获取失败，可能需要Cookie或为付费章节]\n\n" + "="*20 + "\n\n"
+
+        with timed("text"):
+            text = self.extractor.html_to_text(raw_html)
+
+        # De-obfuscate if font_url is present
+        font_url = chapter.get('font_url')
+        if font_url:
+            try:
+                table = self._get_translation_table(font_url)
+                if table:
+                    # Replace characters in one C-level pass
+                    with timed("translate"):
+                        text = text.translate(table)
+                else:
+                    # If mapping is empty but font_url exists, it likely failed.
+                    text = f"[系统提示：字体解密失败 (Mapping Empty)]\n[Font URL: {font_url}]\n" + text
+            except Exception as e:
+                import traceback
+                tb = traceback.format_exc()
+                text = f"[系统提示：字体解密发生严重错误]\n[错误信息: {str(e)}]\n[Traceback: {tb}]\n" + text
+
+        return f"{chapter['title']}\n\n" + text + "\n\n" + "="*20 + "\n\n"
@@ -0,0 +1,34 @@
+import re
+
+
+def select_range(total, start, end):
+    """
+    Indices of chapters start..end, 1-based and inclusive as shown to the user,
+    clamped to the novel. Returns a range, so no list is built for big novels.
+    """
+    start = max(1, int(start))
+    end = min(total, int(end))
+    return range(start - 1, end) if start <= end else range(0)
+
+
+def select_after_downloaded(chapters, downloaded):
+    """
+    Indices of the chapters after the last one already downloaded.
+    downloaded: the {title, url} list of a manifest. Everything is selected when none
+    of those URLs is in chapters any more.
+    """
+    known = {c["url"] for c in downloaded}
+    last = -1
+    for i, chapter in enumerate(chapters):
+        if chapter["url"] in known:
+            last = i
+    return range(last + 1, len(chapters))
+
+
+def select_matching(chapters, pattern):
+    """
+    Indices of chapters whose title matches the regular expression pattern.
+    Raises re.error for an invalid pattern.
+    """
+    regex = re.compile(pattern)
+    return [i for i, chapter in enumerate(chapters) if regex.search(chapter["title"])]
@@ -1,10 +1,11 @@
 import requests
 import base64
+import functools
 import platform
 import subprocess
 import re
 import os
-import datetime
+from .logger import get_logger
 
 # Default User Agents (Fallbacks)
 UA_CHROME = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
@@ -13,19 +14,19 @@ UA_FIREFOX = "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101
 UA_MACOS_CHROME = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
 UA_SAFARI = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4 Safari/605.1.15"
 
-def log_debug(message):
-    """Log debug message to a file on Desktop"""
-    try:
-        desktop = os.path.join(os.path.expanduser("~"), "Desktop")
-        log_file = os.path.join(desktop, "fanqie_debug.log")
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        with open(log_file, "a", encoding="utf-8") as f:
-            f.write(f"[{timestamp}] {message}\n")
-    except:
-        pass
+def log_debug(message, *args):
+    """
+    Log a debug message through the background logger.
+    Pass values as %-style args so nothing is formatted when debug logging is off.
+    """
+    get_logger().debug(message, *args)
 
+@functools.lru_cache(maxsize=1)
 def get_real_chrome_version():
-    """Try to detect the installed Chrome version on macOS"""
+    """
+    Try to detect the installed Chrome version on macOS.
+    Remembered for the life of the process, so building headers spawns Chrome at most once.
+    """
     if platform.system() != 'Darwin':
         return None
     
@@ -38,10 +39,10 @@ def get_real_chrome_version():
             version_match = re.search(r"Google Chrome (\d+\.\d+\.\d+\.\d+)", result.stdout)
             if version_match:
                 full_ver = version_match.group(1)
-                log_debug(f"Detected Chrome version: {full_ver}")
+                log_debug("Detected Chrome version: %s", full_ver)
                 return full_ver
     except Exception as e:
-        log_debug(f"Failed to detect Chrome version: {e}")
+        log_debug("Failed to detect Chrome version: %s", e)
     
     return None
 
@@ -49,13 +50,13 @@ def get_headers(cookie_str=None, user_agent=None):
     """
     Returns headers for requests, including User-Agent and optional Cookie.
     """
-    log_debug(f"Generating headers with UA: {user_agent}")
+    log_debug("Generating headers with UA: %s", user_agent)
     if cookie_str:
-        log_debug(f"Cookie length: {len(cookie_str)}")
+        log_debug("Cookie length: %d", len(cookie_str))
         if "sessionid" in cookie_str:
             log_debug("Cookie contains sessionid")
         else:
-            log_debug("WARNING: Cookie missing sessionid")
+            get_logger().warning("Cookie missing sessionid")
     else:
         log_debug("No cookie provided")
 
@@ -68,7 +69,7 @@ def get_headers(cookie_str=None, user_agent=None):
         if detected_version:
             # Reconstruct UA with real version
             user_agent = f"Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{detected_version} Safari/537.36"
-            log_debug(f"Upgraded UA to: {user_agent}")
+            log_debug("Upgraded UA to: %s", user_agent)
 
     if not user_agent:
         if os_name == 'Windows':
@@ -137,6 +138,14 @@ def download_font_as_base64(font_url):
         print(f"Error downloading font: {e}")
         return None
 
+def get_save_dir():
+    """
+    Returns the directory exported novels are saved to, creating it if needed.
+    """
+    save_dir = os.path.join(os.path.expanduser("~"), "bijianchuanqi")
+    os.makedirs(save_dir, exist_ok=True)
+    return save_dir
+
 def clean_filename(filename):
     """
     Removes invalid characters from filename.
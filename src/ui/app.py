@@ -7,8 +7,18 @@ import browser_cookie3
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 from src.core.scraper import FanqieScraper
-from src.core.utils import clean_filename, UA_CHROME, UA_EDGE, UA_FIREFOX, UA_MACOS_CHROME, UA_SAFARI, log_debug
+from src.core.cache import ChapterCache, FontMapCache, NovelPageCache
+from src.core.checkpoint import DownloadCheckpoint
+from src.core.jobqueue import DownloadQueue
+from src.core.pool import ScraperPool
+from src.core.fileserver import FileServer
+from src.core.cookies import FANQIE_DOMAINS, find_cookies
+from src.core.selection import select_range, select_after_downloaded, select_matching
+from src.core.manifest import NovelManifest
+from src.core.logger import set_log_level, DEFAULT_LEVEL
+from src.core.utils import UA_CHROME, UA_EDGE, UA_FIREFOX, UA_MACOS_CHROME, UA_SAFARI, log_debug
 import platform
+import re
 import subprocess
 import time
 import threading
@@ -471,6 +481,9 @@ with st.expander("⚙️ 软件设置", expanded=False):
         key="theme",
         label_visibility="collapsed"
     )
+    st.write("🪵 **调试日志**")
+    debug_log = st.checkbox("记录详细调试日志（排查问题时开启，会略微降低下载速度）", key="debug_log")
+    set_log_level("DEBUG" if debug_log else os.environ.get("FANQIE_LOG_LEVEL", DEFAULT_LEVEL))
 
 # 已移除启动日志区域，保持界面简洁
 
@@ -541,53 +554,8 @@ if st.button("彻底关闭程序（后台进程占用时使用）"):
 
 def get_browser_cookies(domain_name):
     log_debug(f"Attempting to load cookies for domain: {domain_name}")
-    cookies = []
-    try:
-        cj = browser_cookie3.chrome(domain_name=domain_name)
-        if len(cj) > 0:
-            cookies.append(("Chrome", cj))
-    except Exception as e:
-        log_debug(f"Chrome default error: {e}")
-
-    try:
-        local = os.environ.get('LOCALAPPDATA') or ''
-        roaming = os.environ.get('APPDATA') or ''
-        profiles = ['Default'] + [f'Profile {i}' for i in range(1, 21)]
-
-        def scan_chrome_like(name, base_dir, use_edge=False):
-            if not base_dir:
-                return
-            key_file = os.path.join(base_dir, 'Local State')
-            for prof in profiles:
-                paths = [
-                    os.path.join(base_dir, prof, 'Network', 'Cookies'),
-                    os.path.join(base_dir, prof, 'Cookies'),
-                ]
-                for p in paths:
-                    if os.path.exists(p):
-                        try:
-                            if use_edge:
-                                cj = browser_cookie3.edge(domain_name=domain_name, cookie_file=p)
-                            else:
-                                # 尝试显式传入 key_file，提高兼容能力
-                                try:
-                                    cj = browser_cookie3.chrome(domain_name=domain_name, cookie_file=p, key_file=key_file)
-                                except TypeError:
-                                    cj = browser_cookie3.chrome(domain_name=domain_name, cookie_file=p)
-                            if len(cj) > 0:
-                                cookies.append((name, cj))
-                        except Exception as e:
-                            log_debug(f"{name} profile {prof} error: {e}")
-
-        # 官方 Chrome/Edge
-        scan_chrome_like('Chrome', os.path.join(local, 'Google', 'Chrome', 'User Data'))
-
-        # 仅扫描 Chrome 与 Edge 用户目录
-
-    except Exception as e:
-        log_debug(f"Profile scanning error: {e}")
-
-    return cookies
+    # 各个 Profile 并行读取，每个 Cookie 数据库只读一次并缓存到文件变化为止
+    return find_cookies([domain_name])[domain_name]
 
 def format_cookie_str(cookie_jar):
     return "; ".join([f"{c.name}={c.value}" for c in cookie_jar])
@@ -613,17 +581,11 @@ def format_cookie_str_from_list(jar_list):
     return "; ".join([f"{k}={v}" for k, v in seen.items()])
 
 def get_possible_fanqie_cookies():
-    domains = [
-        "fanqienovel.com",
-        ".fanqienovel.com",
-        "novel.snssdk.com",
-        "i.snssdk.com",
-        "passport.toutiao.com",
-    ]
+    # 一次扫描同时取出所有相关域名的 Cookie
+    found = find_cookies(FANQIE_DOMAINS)
     buckets = {}
-    for d in domains:
-        found = get_browser_cookies(d)
-        for name, jar in found:
+    for d in FANQIE_DOMAINS:
+        for name, jar in found[d]:
             buckets.setdefault(name, []).append(jar)
     return buckets
 
@@ -943,6 +905,82 @@ if 'auto_cookie' in st.session_state:
         if 'cookie_fetched_len' in st.session_state:
             st.success(f"已自动获取 Cookie (长度: {st.session_state['cookie_fetched_len']} 字符)")
 
+def show_job_metrics(summary):
+    """在页面上展示一次下载任务各阶段的耗时统计"""
+    rows = []
+    for stage, m in summary["stages"].items():
+        rows.append({
+            "阶段": stage,
+            "次数": m["count"],
+            "总耗时(s)": m["total_s"],
+            "平均(ms)": m["mean_ms"],
+            "P50(ms)": m["p50_ms"],
+            "P99(ms)": m["p99_ms"],
+            "最大(ms)": m["max_ms"],
+        })
+    with st.expander(f"⏱️ 性能统计（总耗时 {summary['wall_s']:.1f} 秒）", expanded=False):
+        if rows:
+            st.table(rows)
+        if summary["counters"]:
+            st.write(summary["counters"])
+
+# --- 后台下载任务 ---
+# 下载在后台线程中进行，页面交互触发的重新运行不会打断下载，页面只负责轮询任务状态
+@st.cache_resource
+def get_scraper_pool():
+    """
+    按 (Cookie, UA) 复用爬虫实例，保留已建立的连接和解析过的字体；
+    闲置超过 15 分钟的实例会被关闭。所有实例共用同一个限速器和本地缓存
+    """
+    return ScraperPool(ttl=900, chapter_cache=ChapterCache(), font_cache=FontMapCache(), novel_cache=NovelPageCache())
+
+@st.cache_resource
+def get_download_queue():
+    """整个程序共用一个下载队列，多本小说按轮询方式共享同一个限速和并发额度"""
+    # 默认实例只用于程序重启后继续的任务，新任务使用提交时的 Cookie 和 UA
+    queue = DownloadQueue(get_scraper_pool().get(), workers=4)
+    # 上次未完成的任务会从断点继续
+    queue.start()
+    return queue
+
+@st.cache_data(max_entries=32)
+def checkpoint_progress(novel_url, mtime_ns, size):
+    """
+    断点文件的 (已完成, 总章数)。只读取首行并统计行数，不解析已下载的正文；
+    按文件修改时间和大小缓存，文件不变时页面刷新不再重复读取
+    """
+    return DownloadCheckpoint(novel_url).progress()
+
+@st.cache_resource
+def get_file_server():
+    """导出的文件由本地小型 HTTP 服务直接从磁盘分块发送，不再整份交给 Streamlit 保存在内存里"""
+    return FileServer().start()
+
+QUEUE_STATUS_LABELS = {
+    "queued": "排队中",
+    "running": "下载中",
+    "exporting": "导出中",
+    "done": "已完成",
+    "failed": "失败",
+}
+
+def current_user_agent():
+    user_agent = st.session_state.get('auto_ua')
+    if not user_agent:
+        user_agent = UA_MACOS_CHROME if platform.system() == 'Darwin' else UA_CHROME
+    return user_agent
+
+def submit_download(url, **kwargs):
+    """把任务交给后台队列，使用当前的 Cookie 和 UA"""
+    queue = get_download_queue()
+    scraper = get_scraper_pool().get(cookie_str, current_user_agent())
+    job = queue.add(url, scraper=scraper, **kwargs)
+    queue.start()
+    return job
+
+def active_job_urls():
+    return {job["url"] for job in get_download_queue().snapshot() if job["status"] not in ("done", "failed")}
+
 if 'novel_data' not in st.session_state:
     st.session_state.novel_data = None
 if 'chapters' not in st.session_state:
@@ -953,15 +991,13 @@ if st.button("获取信息"):
         st.error("请输入链接")
     else:
         with st.spinner("正在获取小说信息..."):
-            user_agent = st.session_state.get('auto_ua')
-            if not user_agent:
-                user_agent = UA_MACOS_CHROME if platform.system() == 'Darwin' else UA_CHROME
-            
-            scraper = FanqieScraper(cookie_str, user_agent)
-            metadata = scraper.get_novel_metadata(url)
-            if metadata:
-                st.session_state.novel_data = metadata
-                st.session_state.chapters = scraper.get_chapter_list(url)
+            # 复用相同 Cookie/UA 的爬虫实例以保持连接；目录页未变化时服务器返回 304，直接复用上次解析的结果
+            scraper = get_scraper_pool().get(cookie_str, current_user_agent())
+            # 一次请求同时解析小说信息和章节目录
+            novel_info = scraper.get_novel(url)
+            if novel_info:
+                st.session_state.novel_data = novel_info['metadata']
+                st.session_state.chapters = novel_info['chapters']
                 st.success("获取成功！")
             else:
                 st.error("获取失败，请检查链接或网络。")
@@ -980,102 +1016,147 @@ if st.session_state.novel_data:
 
     st.divider()
     
-    # Range selection
-    chapter_options = [f"{i+1}. {c['title']}" for i, c in enumerate(st.session_state.chapters)]
-    
-    # Select All Checkbox
-    select_all = st.checkbox("全选所有章节", value=True)
-    
-    if select_all:
-        selected_chapters = st.multiselect("选择章节", chapter_options, default=chapter_options)
+    # 章节选择：按范围 / 上次下载之后 / 标题匹配，选中结果只保存为下标，
+    # 不再为每一章生成选项，章节再多页面也不会变慢
+    chapters = st.session_state.chapters
+    total_chapters = len(chapters)
+    manifest = NovelManifest(novel['url']).load()
+    select_mode = st.radio("选择章节", ["全部章节", "按范围", "从上次下载处继续", "按标题匹配"], horizontal=True)
+
+    selected_indices = range(total_chapters)
+    if select_mode == "按范围":
+        rcol1, rcol2 = st.columns(2)
+        with rcol1:
+            range_start = st.number_input("起始章节", min_value=1, max_value=max(total_chapters, 1), value=1, step=1)
+        with rcol2:
+            range_end = st.number_input("结束章节", min_value=1, max_value=max(total_chapters, 1), value=max(total_chapters, 1), step=1)
+        selected_indices = select_range(total_chapters, range_start, range_end)
+    elif select_mode == "从上次下载处继续":
+        if manifest:
+            selected_indices = select_after_downloaded(chapters, manifest['chapters'])
+        else:
+            st.caption("还没有下载过这本小说，将下载全部章节")
+    elif select_mode == "按标题匹配":
+        title_pattern = st.text_input("标题正则表达式", placeholder="例如：第1\\d\\d章|番外")
+        if title_pattern:
+            try:
+                selected_indices = select_matching(chapters, title_pattern)
+            except re.error as e:
+                st.error(f"正则表达式有误: {e}")
+                selected_indices = []
+
+    if selected_indices:
+        first, last = chapters[selected_indices[0]], chapters[selected_indices[-1]]
+        st.caption(f"已选择 {len(selected_indices)} 章：{selected_indices[0] + 1}. {first['title']} ～ {selected_indices[-1] + 1}. {last['title']}")
     else:
-        selected_chapters = st.multiselect("选择章节", chapter_options)
-    
-    if st.button("开始下载"):
-        user_agent = st.session_state.get('auto_ua')
-        if not user_agent:
-            user_agent = UA_MACOS_CHROME if platform.system() == 'Darwin' else UA_CHROME
-                
-        scraper = FanqieScraper(cookie_str, user_agent)
-        
-        # Determine chapters to download
-        chapters_to_download = []
-        if not selected_chapters:
-            # Fallback if somehow nothing selected but list is empty, though 'select all' handles this
-            chapters_to_download = [] 
+        st.caption("未选择任何章节")
+
+    workers = st.slider("并发线程数", min_value=1, max_value=FanqieScraper.MAX_WORKERS, value=4, help="线程越多下载越快，但过高可能触发网站限流")
+
+
+    # 断点续传：每下载完一章都会写入进度文件，程序意外关闭后可从上次进度继续
+    get_download_queue().set_workers(workers)
+    novel_running = novel['url'] in active_job_urls()
+    checkpoint = DownloadCheckpoint(novel['url'])
+    resume_progress = None
+    if not novel_running and checkpoint.exists():
+        stat = os.stat(checkpoint.path)
+        resume_progress = checkpoint_progress(novel['url'], stat.st_mtime_ns, stat.st_size)
+    if novel_running:
+        st.info("这本小说正在后台下载，进度见下方「下载任务」")
+    if resume_progress:
+        st.info(f"检测到未完成的下载：已完成 {resume_progress[0]}/{resume_progress[1]} 章")
+        if st.button("继续上次下载"):
+            submit_download(novel['url'])
+            st.success("已在后台继续下载")
+
+    # 增量更新：已导出过的小说只下载新增或改动的章节，追加到原文件
+    if manifest and not novel_running:
+        st.info(f"已下载过 {len(manifest['chapters'])} 章：{manifest['path']}")
+        if st.button("检查更新"):
+            submit_download(novel['url'], mode="update")
+            st.success("已在后台检查更新")
+
+    # 已有导出文件时：「从上次下载处继续」追加到原文件；只选部分章节重新下载会覆盖原文件，需先确认
+    append_to_export = bool(manifest) and select_mode == "从上次下载处继续"
+    overwrite_confirmed = True
+    if manifest and not append_to_export and len(selected_indices) < total_chapters:
+        overwrite_confirmed = st.checkbox(f"覆盖已有文件 {os.path.basename(manifest['path'])}（只保留本次选择的章节）")
+
+    if st.button("开始下载", disabled=novel_running):
+        if not selected_indices:
             st.warning("请至少选择一个章节")
+        elif append_to_export:
+            submit_download(novel['url'], mode="update")
+            st.success("已在后台下载新章节，完成后追加到原文件")
+        elif not overwrite_confirmed:
+            st.warning("这本小说已有导出文件，请勾选覆盖确认，或选择「从上次下载处继续」")
         else:
-            indices = [int(s.split('.')[0]) - 1 for s in selected_chapters]
-            chapters_to_download = [st.session_state.chapters[i] for i in sorted(indices)]
+            chapters_to_download = [chapters[i] for i in selected_indices]
+            submit_download(novel['url'], resume=False, novel=novel, chapters=chapters_to_download)
+            st.success("已加入后台下载，可以继续浏览或添加其他小说")
 
-        if chapters_to_download:
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            
-            # Prepare result list
-            downloaded_content = []
-            
-            completed_count = 0
-            failed_count = 0
-            
-            import random
-            
-            # Single-threaded download
-            for i, chapter in enumerate(chapters_to_download):
-                try:
-                    # Random delay to avoid detection
-                    time.sleep(random.uniform(0.5, 1.5))
-                    
-                    content = scraper.get_chapter_content(chapter['url']) or scraper.get_chapter_content_cdp(chapter['url'])
-                    if content:
-                        content['title'] = chapter['title']
-                        downloaded_content.append(content)
-                        completed_count += 1
-                    else:
-                        failed_count += 1
-                except Exception as e:
-                    log_debug(f"Error fetching {chapter['title']}: {e}")
-                    failed_count += 1
-                
-                # Update progress
-                progress = (i + 1) / len(chapters_to_download)
-                progress_bar.progress(progress)
-                status_text.text(f"进度: {i + 1}/{len(chapters_to_download)} (成功: {completed_count}, 失败: {failed_count})")
-            
-            # Filter out failed downloads (already filtered by append logic)
-            valid_content = downloaded_content
-            
-            if not valid_content:
-                st.error("所有章节下载失败！请检查：\n1. 网络连接\n2. 是否需要更新 Cookie (VIP章节)")
-                status_text.text("下载失败")
-            else:
-                if failed_count > 0:
-                    st.warning(f"下载完成，但有 {failed_count} 个章节失败。")
-                else:
-                    st.success("所有章节下载完成！")
-                
-                status_text.text("正在生成文件...")
-                
-                filename = clean_filename(novel['title'])
-                
-                file_content = scraper.generate_txt(novel, valid_content)
-                file_ext = "txt"
-                mime_type = "text/plain"
-                    
-                try:
-                    save_dir = os.path.join(os.path.expanduser("~"), "bijianchuanqi")
-                    os.makedirs(save_dir, exist_ok=True)
-                    save_path = os.path.join(save_dir, f"{filename}.{file_ext}")
-                    with open(save_path, "w", encoding="utf-8") as f:
-                        f.write(file_content)
-                    st.success(f"✅ 文件已保存到: **{save_path}**")
-                except Exception as e:
-                    st.error(f"自动保存失败: {e}")
-
-                st.download_button(
-                    label=f"点击下载 {file_ext.upper()} 文件 (另存为)",
-                    data=file_content,
-                    file_name=f"{filename}.{file_ext}",
-                    mime=mime_type
-                )
-                st.balloons()
+# --- 批量下载 ---
+st.divider()
+st.markdown("### 📚 批量下载")
+batch_urls = st.text_area("小说主页链接（每行一个）", placeholder="https://fanqienovel.com/page/...\nhttps://fanqienovel.com/page/...")
+qcol1, qcol2 = st.columns(2)
+with qcol1:
+    if st.button("加入下载队列"):
+        urls = [u.strip() for u in batch_urls.splitlines() if u.strip()]
+        if not urls:
+            st.error("请输入链接")
+        else:
+            for u in urls:
+                submit_download(u)
+            st.success(f"已加入 {len(urls)} 本小说")
+with qcol2:
+    if st.button("清除已完成"):
+        get_download_queue().clear_finished()
+
+def render_download_jobs():
+    """下载任务面板：下载进行中时每秒刷新一次，只读取队列状态，不做任何网络请求"""
+    queue = get_download_queue()
+    jobs = queue.snapshot()
+    active = any(job["status"] not in ("done", "failed") for job in jobs)
+    if st.session_state.get('jobs_polling') and not active:
+        # 全部完成后整页刷新一次，停止轮询并显示下载按钮
+        st.session_state['jobs_polling'] = False
+        st.rerun()
+    if not jobs:
+        st.caption("暂无下载任务")
+        return
+
+    st.dataframe(
+        [{
+            "小说": job["title"] or job["url"],
+            "状态": QUEUE_STATUS_LABELS.get(job["status"], job["status"]),
+            "进度": (job["completed"] + job["failed"]) / job["total"] if job["total"] else 0.0,
+            "章节": f"{job['completed']}/{job['total']}" if job["total"] else "-",
+            "失败": job["failed"],
+            "文件": job["path"] or job["error"] or "",
+        } for job in jobs],
+        column_config={"进度": st.column_config.ProgressColumn(min_value=0.0, max_value=1.0)},
+        hide_index=True,
+    )
+    if active:
+        return
+
+    # 下载链接指向本地文件服务，文件内容不经过 Streamlit
+    file_server = get_file_server()
+    finished = [job for job in jobs if job["path"] and os.path.exists(job["path"])][-5:]
+    for job in reversed(finished):
+        download_url = file_server.url_for(job["path"])
+        if download_url:
+            st.link_button(f"点击下载 {os.path.basename(job['path'])} (另存为)", download_url)
+    for job in reversed(jobs):
+        summary = queue.metrics_summary(job["id"])
+        if summary and summary["stages"]:
+            show_job_metrics(summary)
+            break
+
+st.divider()
+st.markdown("### 📥 下载任务")
+jobs_active = bool(active_job_urls())
+st.session_state['jobs_polling'] = jobs_active
+st.fragment(run_every=1.0 if jobs_active else None)(render_download_jobs)()